@@ -0,0 +1,153 @@
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from unittest.mock import patch
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from Feedback.models import FeedbackMessage, FeedbackFingerprint, FeedbackTag
+from Feedback import duplicates
+from Feedback.enrichment import EnrichmentPipeline
+from Feedback.minhash import BANDS, fingerprint, jaccard, shingles
+
+COMPLAINT = "The login page is really slow on my phone"
+REWORDED = "The login page is really slow on my phone!!"
+SIMILAR = "The login page is really slow on my tablet"
+OTHER = "Please add a dark mode to the settings screen"
+
+
+class MinHashTests(SimpleTestCase):
+    def test_fingerprint_is_stable(self):
+        self.assertEqual(fingerprint(COMPLAINT), fingerprint(COMPLAINT))
+        self.assertEqual(len(fingerprint(COMPLAINT)), BANDS)
+
+    def test_normalization(self):
+        self.assertEqual(fingerprint(COMPLAINT), fingerprint(REWORDED))
+        self.assertEqual(fingerprint("ＬＯＧＩＮ broken"), fingerprint("login broken"))
+
+    def test_near_duplicates_share_a_band(self):
+        self.assertGreaterEqual(jaccard(shingles(COMPLAINT), shingles(SIMILAR)), 0.5)
+        shared = set(enumerate(fingerprint(COMPLAINT))) & set(enumerate(fingerprint(SIMILAR)))
+        self.assertTrue(shared)
+        self.assertFalse(set(enumerate(fingerprint(COMPLAINT))) & set(enumerate(fingerprint(OTHER))))
+
+
+class NearDuplicateTests(APITestCase):
+    def setUp(self):
+        self.url = reverse('feedback-list')
+        self.pipeline = EnrichmentPipeline(settings.FEEDBACK_ENRICHMENT_ANALYZERS, enabled=False)
+
+    def create(self, *messages):
+        return [FeedbackMessage.objects.create(message=message) for message in messages]
+
+    def test_enrichment_indexes_and_clusters(self):
+        first, second, third, other = self.create(COMPLAINT, REWORDED, SIMILAR, OTHER)
+        self.pipeline.process_batch([first.id, second.id])
+        self.pipeline.process_batch([third.id, other.id])
+
+        self.assertEqual(FeedbackFingerprint.objects.filter(feedback=first).count(), BANDS)
+        clusters = dict(FeedbackMessage.objects.values_list('id', 'cluster_id'))
+        self.assertEqual(clusters[first.id], first.id)
+        self.assertEqual(clusters[second.id], first.id)
+        self.assertEqual(clusters[third.id], first.id)
+        self.assertEqual(clusters[other.id], other.id)
+
+    def test_member_deleted_while_clustering_is_skipped(self):
+        first, second, third = self.create(COMPLAINT, SIMILAR, REWORDED)
+        self.pipeline.process_batch([first.id, second.id])
+        chunked = duplicates.chunked
+        calls = []
+
+        def delete_after_bucket_query(items, *args):
+            calls.append(items)
+            # Chunked fingerprint delete, bucket query, then the text query
+            if len(calls) == 3:
+                # Deleted between the bucket query and the text query
+                FeedbackMessage.objects.filter(id=first.id).delete()
+            return chunked(items, *args)
+
+        with patch('Feedback.duplicates.chunked', side_effect=delete_after_bucket_query):
+            self.pipeline.process_batch([third.id])
+        self.assertEqual(FeedbackMessage.objects.get(id=third.id).cluster_id, first.id)
+        self.assertTrue(FeedbackMessage.objects.get(id=third.id).enriched_at)
+
+    def test_similar_endpoint(self):
+        first, second, third, other = self.create(COMPLAINT, REWORDED, SIMILAR, OTHER)
+        self.pipeline.process_batch([first.id, second.id, third.id, other.id])
+
+        response = self.client.get(reverse('feedback-similar', args=[first.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['id'] for r in response.data['results']], [second.id, third.id])
+        self.assertEqual(response.data['results'][0]['similarity'], 1.0)
+        self.assertLess(response.data['results'][1]['similarity'], 1.0)
+
+    def test_similar_endpoint_without_fingerprints(self):
+        first, second = self.create(COMPLAINT, OTHER)
+        self.pipeline.process_batch([second.id])
+        unindexed = FeedbackMessage.objects.create(message=REWORDED)
+        self.pipeline.process_batch([first.id])
+
+        response = self.client.get(reverse('feedback-similar', args=[unindexed.id]))
+        self.assertEqual([r['id'] for r in response.data['results']], [first.id])
+
+    def test_similar_endpoint_not_found(self):
+        response = self.client.get(reverse('feedback-similar', args=[999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn('error', response.data)
+
+        flagged = FeedbackMessage.objects.create(message=COMPLAINT, moderation_status=FeedbackMessage.MODERATION_FLAGGED)
+        response = self.client.get(reverse('feedback-similar', args=[flagged.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_collapse(self):
+        first, second, third, other = self.create(COMPLAINT, REWORDED, SIMILAR, OTHER)
+        self.pipeline.process_batch([first.id, second.id, third.id, other.id])
+        unclustered = FeedbackMessage.objects.create(message="Brand new")
+
+        response = self.client.get(self.url, {'collapse': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        sizes = {r['id']: r['cluster_size'] for r in response.data['results']}
+        self.assertEqual(sizes, {unclustered.id: 1, other.id: 1, third.id: 3})
+
+        response = self.client.get(self.url, {'collapse': '1', 'fields': 'id'})
+        self.assertEqual(response.data['results'][0], {'id': unclustered.id, 'cluster_size': 1})
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 5)
+        self.assertNotIn('cluster_size', response.data['results'][0])
+
+    def test_list_collapse_respects_filters(self):
+        first, second, third = self.create(COMPLAINT, REWORDED, SIMILAR)
+        self.pipeline.process_batch([first.id, second.id, third.id])
+        # Only the older members carry the tag
+        FeedbackTag.objects.all().delete()
+        FeedbackTag.objects.create(feedback=first, name='mobile')
+        FeedbackTag.objects.create(feedback=second, name='mobile')
+
+        response = self.client.get(self.url, {'tag': 'mobile', 'collapse': '1'})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(
+            [(r['id'], r['cluster_size']) for r in response.data['results']], [(second.id, 2)]
+        )
+
+    def test_cluster_command(self):
+        first, second, third, other = self.create(COMPLAINT, REWORDED, SIMILAR, OTHER)
+        out = StringIO()
+        call_command('cluster_feedback', '--workers', '1', '--batch-size', '2', stdout=out)
+        self.assertIn('Fingerprinted 4 rows', out.getvalue())
+        self.assertIn('1 clusters with near-duplicates', out.getvalue())
+        clusters = dict(FeedbackMessage.objects.values_list('id', 'cluster_id'))
+        self.assertEqual(clusters, {first.id: first.id, second.id: first.id, third.id: first.id, other.id: other.id})
+
+        FeedbackMessage.objects.update(cluster_id=None)
+        call_command('cluster_feedback', '--workers', '1', '--reset', stdout=StringIO())
+        self.assertEqual(FeedbackFingerprint.objects.count(), 4 * BANDS)
+        self.assertEqual(FeedbackMessage.objects.get(id=third.id).cluster_id, first.id)
+
+    def test_cluster_command_pool_is_spawned(self):
+        with patch('Feedback.enrichment.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool:
+            call_command('cluster_feedback', '--workers', '2', stdout=StringIO())
+        self.assertEqual(pool.call_args.kwargs['mp_context'].get_start_method(), 'spawn')
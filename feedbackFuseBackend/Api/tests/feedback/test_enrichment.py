@@ -0,0 +1,149 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from unittest.mock import patch
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from Feedback.models import FeedbackMessage, FeedbackTag
+from Feedback.views import FeedbackListView
+from Feedback.apps import serves_requests
+from Feedback.enrichment import EnrichmentPipeline
+from Feedback.analyzers import guess_language, score_sentiment, extract_keywords, analyze_batch
+
+
+class AnalyzerTests(SimpleTestCase):
+    def test_guess_language(self):
+        self.assertEqual(guess_language("The app is great and very fast")['language'], 'en')
+        self.assertEqual(guess_language("La aplicación es muy buena para el trabajo")['language'], 'es')
+        self.assertIsNone(guess_language("👍👍")['language'])
+
+    def test_score_sentiment(self):
+        self.assertEqual(score_sentiment("Great app, love it")['sentiment'], 1.0)
+        self.assertEqual(score_sentiment("Slow and broken")['sentiment'], -1.0)
+        self.assertEqual(score_sentiment("Not good")['sentiment'], -1.0)
+        self.assertEqual(score_sentiment("It exists")['sentiment'], 0.0)
+
+    def test_extract_keywords(self):
+        keywords = extract_keywords("Login fails. Login fails on mobile, the mobile login is broken")['keywords']
+        self.assertEqual(keywords[:3], ['login', 'fails', 'mobile'])
+        self.assertNotIn('the', keywords)
+
+    def test_analyze_batch_merges_analyzers(self):
+        analyzers = [
+            'Feedback.analyzers.guess_language',
+            'Feedback.analyzers.score_sentiment',
+            'Feedback.analyzers.extract_keywords',
+        ]
+        results = analyze_batch(analyzers, [(1, "Great mobile app")])
+        self.assertEqual(results, [(1, {'language': None, 'sentiment': 1.0, 'keywords': ['great', 'mobile', 'app']})])
+
+
+class EnrichmentPipelineTests(APITestCase):
+    def setUp(self):
+        self.url = reverse('feedback-list')
+        self.pipeline = EnrichmentPipeline(settings.FEEDBACK_ENRICHMENT_ANALYZERS, enabled=False)
+
+    def test_process_batch_writes_results(self):
+        good = FeedbackMessage.objects.create(message="The mobile app is great")
+        bad = FeedbackMessage.objects.create(message="Login is slow and broken")
+
+        self.assertEqual(self.pipeline.process_batch([good.id, bad.id]), 2)
+
+        good.refresh_from_db()
+        self.assertEqual(good.language, 'en')
+        self.assertEqual(good.sentiment, 1.0)
+        self.assertIsNotNone(good.enriched_at)
+        self.assertEqual(set(good.tags.values_list('name', flat=True)), {'mobile', 'app', 'great'})
+        self.assertEqual(FeedbackMessage.objects.get(id=bad.id).sentiment, -1.0)
+
+    def test_reprocessing_replaces_tags(self):
+        feedback = FeedbackMessage.objects.create(message="Great app")
+        self.pipeline.process_batch([feedback.id])
+        FeedbackMessage.objects.filter(id=feedback.id).update(message="Slow login")
+        self.pipeline.process_batch([feedback.id])
+        self.assertEqual(set(feedback.tags.values_list('name', flat=True)), {'slow', 'login'})
+
+    def test_missing_ids_are_skipped(self):
+        self.assertEqual(self.pipeline.process_batch([12345]), 0)
+
+    def test_create_enqueues_after_commit(self):
+        with patch.object(FeedbackListView.enrichment, 'enabled', True), \
+                patch.object(FeedbackListView.enrichment, 'enqueue') as enqueue, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {'message': "Hello"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        enqueue.assert_called_once_with(response.data['id'])
+
+    def test_queue_is_bounded(self):
+        pipeline = EnrichmentPipeline(settings.FEEDBACK_ENRICHMENT_ANALYZERS, queue_size=2)
+        # Started without the thread, so nothing drains the queue
+        pipeline._pid = os.getpid()
+        with self.assertLogs('Feedback.enrichment', 'WARNING') as logs:
+            for feedback_id in range(1, 5):
+                pipeline.enqueue(feedback_id)
+        self.assertEqual(pipeline._queue.qsize(), 2)
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn('queue full; feedback 3', logs.output[0])
+
+    def test_enqueue_before_start_is_dropped(self):
+        pipeline = EnrichmentPipeline(settings.FEEDBACK_ENRICHMENT_ANALYZERS)
+        with self.assertLogs('Feedback.enrichment', 'WARNING'):
+            pipeline.enqueue(1)
+        self.assertEqual(pipeline._queue.qsize(), 0)
+        self.assertIsNone(pipeline._thread)
+
+    def test_started_pool_uses_spawned_processes(self):
+        pipeline = EnrichmentPipeline(settings.FEEDBACK_ENRICHMENT_ANALYZERS, workers=2)
+        pipeline.start()
+        self.addCleanup(pipeline._executor.shutdown)
+        # Keep processes forked by later tests from starting another pool
+        self.addCleanup(setattr, pipeline, '_pid', None)
+        self.assertEqual(pipeline._executor._mp_context.get_start_method(), 'spawn')
+        self.assertTrue(pipeline._thread.is_alive())
+        results = pipeline.analyze([(1, "Great app"), (2, "Slow login")], pipeline._executor)
+        self.assertEqual(sorted(result['sentiment'] for _, result in results), [-1.0, 1.0])
+
+    def test_backfill_pool_is_spawned(self):
+        with patch('Feedback.enrichment.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool:
+            call_command('enrich_feedback', '--workers', '2', stdout=StringIO())
+        self.assertEqual(pool.call_args.kwargs['mp_context'].get_start_method(), 'spawn')
+
+    def test_background_work_only_starts_for_serving_processes(self):
+        for argv, expected in [
+            (['manage.py', 'runserver'], True),
+            (['/srv/venv/bin/gunicorn', 'feedbackFuseBackend.wsgi'], True),
+            (['manage.py', 'enrich_feedback'], False),
+            (['manage.py', 'migrate'], False),
+        ]:
+            with self.subTest(argv=argv), patch('sys.argv', argv):
+                self.assertEqual(serves_requests(), expected)
+
+    def test_list_filters_by_tag_and_language(self):
+        english = FeedbackMessage.objects.create(message="The mobile app is great")
+        spanish = FeedbackMessage.objects.create(message="La aplicación mobile es muy buena")
+        FeedbackMessage.objects.create(message="Not enriched yet")
+        self.pipeline.process_batch([english.id, spanish.id])
+
+        response = self.client.get(self.url, {'tag': 'Mobile'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+
+        response = self.client.get(self.url, {'tag': 'mobile', 'language': 'es'})
+        self.assertEqual([r['id'] for r in response.data['results']], [spanish.id])
+
+    def test_backfill_command(self):
+        for i in range(5):
+            FeedbackMessage.objects.create(message=f"Great app number {i}")
+        out = StringIO()
+        call_command('enrich_feedback', '--workers', '1', '--batch-size', '2', stdout=out)
+        self.assertIn('Enriched 5 rows', out.getvalue())
+        self.assertFalse(FeedbackMessage.objects.filter(enriched_at__isnull=True).exists())
+        self.assertEqual(FeedbackTag.objects.filter(name='great').count(), 5)
+
+        out = StringIO()
+        call_command('enrich_feedback', '--workers', '1', stdout=out)
+        self.assertIn('Enriched 0 rows', out.getvalue())
@@ -2,6 +2,8 @@
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from unittest.mock import patch
 from datetime import datetime, timedelta
 from django.utils.timezone import make_aware
@@ -37,3 +39,52 @@ class FeedbackListTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['count'], 0)
         self.assertEqual(response.data['results'], [])
+
+
+class FeedbackListProjectionTests(APITestCase):
+    def setUp(self):
+        self.url = reverse('feedback-list')
+        self.msg = FeedbackMessage.objects.create(message="Could use better mobile responsiveness")
+
+    def test_fields_limits_response_keys(self):
+        response = self.client.get(self.url, {'fields': 'id,message'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(dict(response.data['results'][0]), {
+            'id': self.msg.id,
+            'message': "Could use better mobile responsiveness",
+        })
+
+    def test_fields_projection_reaches_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url, {'fields': 'id'})
+        select = next(q['sql'] for q in ctx.captured_queries if 'COUNT' not in q['sql'])
+        self.assertNotIn('"message"', select)
+        self.assertNotIn('"created_at" AS', select)
+
+    def test_preview_len_truncates_message(self):
+        response = self.client.get(self.url, {'fields': 'id,message', 'preview_len': 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['message'], "Could use ")
+
+    def test_preview_len_without_fields_keeps_all_fields(self):
+        response = self.client.get(self.url, {'preview_len': 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['results'][0]
+        self.assertEqual(result['message'], "Could")
+        self.assertEqual(result['id'], self.msg.id)
+        self.assertTrue(result['created_at'].endswith('Z'))
+
+    def test_invalid_fields(self):
+        for fields in ['password', 'id,nope', ',']:
+            with self.subTest(fields=fields):
+                response = self.client.get(self.url, {'fields': fields})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn('error', response.data)
+
+    def test_invalid_preview_len(self):
+        for preview_len in ['0', '-3', 'abc']:
+            with self.subTest(preview_len=preview_len):
+                response = self.client.get(self.url, {'preview_len': preview_len})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn('error', response.data)
@@ -0,0 +1,219 @@
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from django.apps import apps
+from django.db.models.signals import post_delete, post_migrate
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from Feedback.models import FeedbackMessage
+from Feedback.apps import connect_hot_tail_invalidation
+from Feedback.views import FeedbackListView
+from Feedback.hot_tail import HotTail, SEQ_OFFSET, newest_feedback
+
+
+def temp_path(test):
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    return os.path.join(directory.name, 'hot-tail')
+
+
+class FeedbackHotTailTests(APITestCase):
+    def setUp(self):
+        self.url = reverse('feedback-list')
+        self.hot_tail = HotTail(path=temp_path(self), capacity=8, loader=newest_feedback)
+        self.addCleanup(self.hot_tail.close)
+        patcher = patch.object(FeedbackListView, 'hot_tail', self.hot_tail)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, message):
+        # The ring is only fed once the row is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, {'message': message}, format='json')
+
+    def from_db(self, params):
+        self.hot_tail.enabled = False
+        try:
+            return self.client.get(self.url, params).data
+        finally:
+            self.hot_tail.enabled = True
+
+    def test_first_page_served_without_queries(self):
+        for message in ["First", "Second", "Third"]:
+            self.post(message)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'limit': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual([r['message'] for r in response.data['results']], ["Third", "Second"])
+        self.assertEqual(response.data, self.from_db({'limit': 2}))
+
+    def test_warms_from_table(self):
+        base = datetime(2025, 6, 1, 9, 0, tzinfo=timezone.utc)
+        for i in range(5):
+            feedback = FeedbackMessage.objects.create(message=f"Message {i}")
+            FeedbackMessage.objects.filter(pk=feedback.pk).update(created_at=base + timedelta(minutes=i))
+        FeedbackMessage.objects.create(message="Held back", moderation_status=FeedbackMessage.MODERATION_FLAGGED)
+
+        response = self.client.get(self.url, {'limit': 3})
+        self.assertEqual(response.data, self.from_db({'limit': 3}))
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(response.data['results'][0]['created_at'], '2025-06-01T09:04:00Z')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'limit': 5})
+        self.assertEqual(response.data, self.from_db({'limit': 5}))
+
+    def test_projection_matches_database(self):
+        self.post("Please add dark mode")
+        self.post("Export to CSV")
+
+        params = {'limit': 2, 'fields': 'id,message', 'preview_len': 6}
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.data, self.from_db(params))
+        self.assertEqual(response.data['results'][0], {'id': response.data['results'][0]['id'], 'message': 'Export'})
+
+    def test_filters_and_large_pages_use_database(self):
+        for i in range(10):
+            self.post(f"Message {i}")
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'limit': 10})
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(response.data['count'], 10)
+
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {'limit': 2, 'language': 'en'})
+
+    def test_rolled_back_rows_never_reach_the_ring(self):
+        self.client.post(self.url, {'message': "Rolled back"}, format='json')
+        response = self.client.get(self.url, {'limit': 2})
+        self.assertEqual(response.data['results'][0]['message'], "Rolled back")
+        self.assertEqual(self.hot_tail.newest(2)[1], 1)
+        # The row only reached the ring through the warm-up, not the append
+        self.assertEqual(len(self.hot_tail.newest(2)[0]), 1)
+
+    def test_deletes_make_workers_rewarm(self):
+        # Connected at startup only when the configured ring is on
+        connect_hot_tail_invalidation(apps.get_app_config('Feedback'))
+        self.addCleanup(post_delete.disconnect, dispatch_uid='feedback-hot-tail-delete', sender=FeedbackMessage)
+        self.addCleanup(post_migrate.disconnect, dispatch_uid='feedback-hot-tail-flush',
+                        sender=apps.get_app_config('Feedback'))
+        first = self.post("First").data['id']
+        self.post("Second")
+        FeedbackMessage.objects.filter(id=first).delete()
+
+        response = self.client.get(self.url, {'limit': 2})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual([r['message'] for r in response.data['results']], ["Second"])
+
+    def test_unreadable_ring_falls_back_to_database(self):
+        with tempfile.NamedTemporaryFile() as not_a_directory:
+            broken = HotTail(path=os.path.join(not_a_directory.name, 'ring'), loader=newest_feedback)
+            with patch.object(FeedbackListView, 'hot_tail', broken):
+                FeedbackMessage.objects.create(message="Stored")
+                with self.assertLogs('Feedback.views', 'ERROR'):
+                    response = self.client.get(self.url, {'limit': 2})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.data['results'][0]['message'], "Stored")
+
+                # A failed append still answers 201 for the saved row
+                with self.assertLogs('Feedback.views', 'ERROR'):
+                    response = self.post("Saved anyway")
+                self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+                self.assertEqual(FeedbackMessage.objects.count(), 2)
+
+    def test_disabled_ring_adds_no_delete_receiver(self):
+        # The configured ring is off under tests; a receiver would cost every
+        # queryset.delete() a signal, and with the ring on a lock, per row
+        self.assertFalse(post_delete.has_listeners(FeedbackMessage))
+
+    def test_invalid_limit(self):
+        for limit in ['abc', '0', '101']:
+            with self.subTest(limit=limit):
+                response = self.client.get(self.url, {'limit': limit})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn('error', response.data)
+
+
+class HotTailRingTests(SimpleTestCase):
+    def setUp(self):
+        self.path = temp_path(self)
+        self.now = datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+    def ring(self, capacity=4):
+        ring = HotTail(path=self.path, capacity=capacity)
+        self.addCleanup(ring.close)
+        return ring
+
+    def test_wraps_around_keeping_newest(self):
+        ring = self.ring()
+        for i in range(1, 8):
+            ring.append(i, f"Message {i}", self.now + timedelta(seconds=i))
+
+        rows, count = ring.newest(4)
+        self.assertEqual([row['id'] for row in rows], [7, 6, 5, 4])
+        self.assertEqual(count, 7)
+        self.assertEqual(rows[0]['created_at'], self.now + timedelta(seconds=7))
+
+    def test_shared_between_workers(self):
+        writer, reader = self.ring(), self.ring()
+        writer.append(1, "Café is slow", self.now)
+        writer.append(1, "Café is slow", self.now)
+
+        rows, count = reader.newest(2)
+        self.assertEqual(count, 1)
+        self.assertEqual(rows, [{'id': 1, 'message': "Café is slow", 'created_at': self.now}])
+
+    def test_out_of_order_appends_are_sorted(self):
+        ring = self.ring()
+        ring.append(2, "Second", self.now + timedelta(seconds=2))
+        ring.append(1, "First", self.now + timedelta(seconds=1))
+        self.assertEqual([row['id'] for row in ring.newest(2)[0]], [2, 1])
+
+    def test_recovers_from_writer_that_died(self):
+        ring = self.ring()
+        ring.append(1, "First", self.now)
+        # Killed between begin and end: the sequence is left odd
+        ring._begin_write()
+        ring.append(2, "Second", self.now + timedelta(seconds=1))
+        self.assertEqual(ring._mm[SEQ_OFFSET] % 2, 0)
+        self.assertEqual([row['id'] for row in ring.newest(2)[0]], [2, 1])
+
+        ring._begin_write()
+        self.assertEqual([row['id'] for row in ring.newest(2)[0]], [2, 1])
+        self.assertEqual(ring._mm[SEQ_OFFSET] % 2, 0)
+
+    def test_other_database_starts_cold(self):
+        ring = self.ring()
+        ring.append(1, "First", self.now)
+        with patch('Feedback.hot_tail.database_identity', return_value=42):
+            other = self.ring()
+            self.assertEqual(other.newest(1), ([], 0))
+
+    def test_refuses_files_it_does_not_own_privately(self):
+        with open(self.path, 'w'):
+            pass
+        os.chmod(self.path, 0o644)
+        with self.assertRaises(PermissionError):
+            self.ring().newest(1)
+
+        os.remove(self.path)
+        target = self.path + '-target'
+        open(target, 'w').close()
+        os.symlink(target, self.path)
+        with self.assertRaises(OSError):
+            self.ring().newest(1)
+
+    def test_misses_when_ring_cannot_answer(self):
+        ring = self.ring()
+        self.assertIsNone(ring.newest(5))
+        ring.enabled = False
+        self.assertIsNone(ring.newest(1))
+        self.assertFalse(HotTail(path=None).enabled)
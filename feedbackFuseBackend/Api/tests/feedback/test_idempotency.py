@@ -0,0 +1,144 @@
+import threading
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from Feedback.models import FeedbackMessage
+from Feedback.views import FeedbackListView
+from Feedback.idempotency import IdempotencyConflict, IdempotencyStore
+
+
+class FeedbackIdempotencyTests(APITestCase):
+    def setUp(self):
+        self.url = reverse('feedback-list')
+        FeedbackListView.idempotency_store.clear()
+
+    def post(self, message, key):
+        return self.client.post(self.url, {'message': message}, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_original_response(self):
+        first = self.post("Kiosk says hi", 'key-1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(0):
+            retry = self.post("Kiosk says hi", 'key-1')
+
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(FeedbackMessage.objects.count(), 1)
+
+    def test_different_keys_create_separate_messages(self):
+        self.post("Same text", 'key-1')
+        self.post("Same text", 'key-2')
+        self.assertEqual(FeedbackMessage.objects.count(), 2)
+
+    def test_no_key_is_not_deduplicated(self):
+        self.client.post(self.url, {'message': "Same text"}, format='json')
+        self.client.post(self.url, {'message': "Same text"}, format='json')
+        self.assertEqual(FeedbackMessage.objects.count(), 2)
+
+    def test_key_reused_with_different_message(self):
+        self.post("First", 'key-1')
+        response = self.post("Second", 'key-1')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertIn('error', response.data)
+        self.assertEqual(FeedbackMessage.objects.count(), 1)
+
+    def test_invalid_request_does_not_consume_key(self):
+        response = self.post("", 'key-1')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.post("Now valid", 'key-1')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_failed_save_releases_key(self):
+        with patch('Feedback.serializers.FeedbackSerializer.save', side_effect=RuntimeError('db down')), \
+                self.assertLogs('Feedback.views', 'ERROR'):
+            response = self.post("Hello", 'key-1')
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        response = self.post("Hello", 'key-1')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(FeedbackMessage.objects.count(), 1)
+
+    def test_key_too_long(self):
+        response = self.post("Hello", 'k' * 256)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(FeedbackMessage.objects.count(), 0)
+
+
+class IdempotencyStoreTests(SimpleTestCase):
+    def test_concurrent_claims_have_single_owner(self):
+        store = IdempotencyStore()
+        barrier = threading.Barrier(8)
+        owners = []
+        results = []
+
+        def worker():
+            barrier.wait()
+            entry, owner = store.claim('key', 'message')
+            if owner:
+                owners.append(entry)
+                entry.finish('saved')
+            else:
+                entry.wait(5)
+                results.append(entry.result)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(owners), 1)
+        self.assertEqual(results, ['saved'] * 7)
+
+    def test_size_eviction(self):
+        store = IdempotencyStore(max_entries=3)
+        for i in range(5):
+            entry, _ = store.claim(f'key-{i}', 'message')
+            entry.finish('saved')
+        self.assertEqual(len(store), 3)
+        entry, owner = store.claim('key-0', 'message')
+        self.assertTrue(owner)
+        entry.finish('saved')
+        _, owner = store.claim('key-4', 'message')
+        self.assertFalse(owner)
+
+    def test_in_flight_entries_are_not_evicted(self):
+        store = IdempotencyStore(max_entries=2)
+        in_flight, _ = store.claim('key-0', 'message')
+        done, _ = store.claim('key-1', 'message')
+        done.finish('saved')
+
+        store.claim('key-2', 'message')
+        entry, owner = store.claim('key-0', 'message')
+        self.assertFalse(owner)
+        self.assertIs(entry, in_flight)
+
+        # Only in-flight entries left: refuse rather than evict
+        with self.assertRaises(IdempotencyConflict) as raised:
+            store.claim('key-3', 'message')
+        self.assertEqual(raised.exception.status_code, 503)
+
+    def test_ttl_expiry(self):
+        store = IdempotencyStore(ttl=60)
+        with patch('Feedback.idempotency.time.monotonic', return_value=1000):
+            store.claim('key', 'message')
+        with patch('Feedback.idempotency.time.monotonic', return_value=1059):
+            _, owner = store.claim('key', 'message')
+            self.assertFalse(owner)
+        with patch('Feedback.idempotency.time.monotonic', return_value=1061):
+            _, owner = store.claim('key', 'message')
+            self.assertTrue(owner)
+
+    def test_release_wakes_waiters(self):
+        store = IdempotencyStore()
+        entry, _ = store.claim('key', 'message')
+        store.release('key', entry)
+        self.assertTrue(entry.wait(0))
+        self.assertIsNone(entry.result)
+        _, owner = store.claim('key', 'message')
+        self.assertTrue(owner)
@@ -0,0 +1,146 @@
+import io
+import json
+import logging
+import os
+import signal
+import tempfile
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from Feedback.request_logging import QueueLoggingHandler, RequestIdFilter, SamplingFilter
+from Feedback.serializers import FeedbackSerializer
+
+
+class CapturedLogs:
+    """Route the Feedback loggers to a QueueLoggingHandler writing to memory."""
+
+    def __init__(self, test):
+        self.stream = io.StringIO()
+        self.handler = QueueLoggingHandler(stream=self.stream)
+        self.handler.addFilter(RequestIdFilter())
+        logger = logging.getLogger('Feedback')
+        patcher = patch.object(logger, 'handlers', [self.handler])
+        patcher.start()
+        test.addCleanup(patcher.stop)
+        test.addCleanup(self.handler.close)
+
+    def lines(self):
+        self.handler.flush()
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+
+class RequestLoggingTests(APITestCase):
+    def setUp(self):
+        self.url = reverse('feedback-list')
+        self.logs = CapturedLogs(self)
+
+    def test_request_line_with_timing(self):
+        response = self.client.get(self.url)
+        request_id = response['X-Request-ID']
+        self.assertEqual(len(request_id), 32)
+
+        [line] = self.logs.lines()
+        self.assertEqual(line['level'], 'INFO')
+        self.assertEqual(line['logger'], 'Feedback.requests')
+        self.assertEqual(line['message'], 'GET /api/feedback/ 200')
+        self.assertEqual(line['request_id'], request_id)
+        self.assertEqual((line['method'], line['path'], line['status']), ('GET', '/api/feedback/', 200))
+        self.assertGreater(line['duration_ms'], 0)
+        self.assertTrue(line['time'].endswith('Z'))
+
+    def test_client_request_id_is_kept(self):
+        response = self.client.get(self.url, HTTP_X_REQUEST_ID='abc-123')
+        self.assertEqual(response['X-Request-ID'], 'abc-123')
+        self.assertEqual(self.logs.lines()[0]['request_id'], 'abc-123')
+
+    def test_view_errors_share_the_request_id(self):
+        with patch.object(FeedbackSerializer, 'save', side_effect=RuntimeError('disk full')):
+            response = self.client.post(self.url, {'message': "Hello"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        error, request = self.logs.lines()
+        self.assertEqual(error['logger'], 'Feedback.views')
+        self.assertEqual(error['message'], 'Error creating feedback')
+        self.assertIn('RuntimeError: disk full', error['exception'])
+        self.assertEqual(request['level'], 'ERROR')
+        self.assertEqual(error['request_id'], response['X-Request-ID'])
+        self.assertEqual(request['request_id'], response['X-Request-ID'])
+
+
+class LoggingPipelineTests(SimpleTestCase):
+    def record(self, level=logging.INFO, msg='hello %s', args=('world',)):
+        return logging.LogRecord('Feedback.test', level, __file__, 1, msg, args, None)
+
+    def test_sampling_per_level(self):
+        sampling = SamplingFilter(rates={'INFO': 0.0, 'WARNING': 1.0})
+        self.assertFalse(sampling.filter(self.record(logging.INFO)))
+        self.assertTrue(sampling.filter(self.record(logging.WARNING)))
+        self.assertTrue(sampling.filter(self.record(logging.ERROR)))
+
+        with patch('Feedback.request_logging.random.random', side_effect=[0.1, 0.3]):
+            sampling = SamplingFilter(rates={'INFO': 0.25})
+            self.assertTrue(sampling.filter(self.record()))
+            self.assertFalse(sampling.filter(self.record()))
+
+    def test_rate_limit_reports_dropped_records(self):
+        now = [0.0]
+        sampling = SamplingFilter(limits={'ERROR': 2}, clock=lambda: now[0])
+        kept = [sampling.filter(self.record(logging.ERROR)) for _ in range(5)]
+        self.assertEqual(kept, [True, True, False, False, False])
+
+        now[0] = 0.5
+        record = self.record(logging.ERROR)
+        self.assertTrue(sampling.filter(record))
+        self.assertEqual(record.dropped, 3)
+        self.assertFalse(sampling.filter(self.record(logging.ERROR)))
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = QueueLoggingHandler(stream=io.StringIO(), max_queue=2)
+        self.addCleanup(handler.close)
+        # No listener running, so nothing drains the queue
+        for _ in range(5):
+            handler.enqueue(handler.prepare(self.record()))
+        self.assertEqual(handler.queue.qsize(), 2)
+        self.assertEqual(handler.overflowed, 3)
+
+    def test_writes_json_lines_from_background_thread(self):
+        stream = io.StringIO()
+        handler = QueueLoggingHandler(stream=stream)
+        self.addCleanup(handler.close)
+        handler.handle(self.record())
+        self.assertIsNotNone(handler.listener)
+
+        handler.flush()
+        line = json.loads(stream.getvalue())
+        self.assertEqual(line['message'], 'hello world')
+        self.assertEqual(line['level'], 'INFO')
+
+    def test_forked_child_gets_its_own_queue(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'child.jsonl')
+        handler = QueueLoggingHandler(filename=path)
+        self.addCleanup(handler.close)
+        # Queued in the parent, and its mutex held as if by a listener mid-get
+        handler.enqueue(handler.prepare(self.record(args=('parent',))))
+        handler.queue.mutex.acquire()
+        try:
+            pid = os.fork()
+            if pid == 0:
+                # Fail rather than hang if the child blocks on the parent's mutex
+                signal.alarm(10)
+                try:
+                    handler.handle(self.record(args=('child',)))
+                    handler.flush()
+                finally:
+                    os._exit(0)
+            _, status = os.waitpid(pid, 0)
+        finally:
+            handler.queue.mutex.release()
+
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        with open(path) as f:
+            self.assertEqual([json.loads(line)['message'] for line in f], ['hello child'])
+        self.assertEqual(handler.queue.qsize(), 1)
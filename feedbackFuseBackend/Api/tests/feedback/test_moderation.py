@@ -0,0 +1,126 @@
+import os
+import tempfile
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from Feedback.models import FeedbackMessage
+from Feedback.views import FeedbackListView
+from Feedback.moderation import TermMatcher, ModerationFilter, APPROVED, FLAGGED, BLOCKED
+
+
+class FeedbackModerationTests(APITestCase):
+    def setUp(self):
+        self.url = reverse('feedback-list')
+        moderation = ModerationFilter.from_terms(blocked=['spamword'], flagged=['refund'])
+        patcher = patch.object(FeedbackListView, 'moderation', moderation)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_blocked_message_is_rejected(self):
+        response = self.client.post(self.url, {'message': "Buy SPAMWORD now"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
+        self.assertEqual(FeedbackMessage.objects.count(), 0)
+
+    def test_flagged_message_is_held_from_wall(self):
+        response = self.client.post(self.url, {'message': "I want a refund"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['moderation_status'], FLAGGED)
+        self.assertEqual(FeedbackMessage.objects.get().moderation_status, FLAGGED)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(response.data['results'], [])
+
+    def test_clean_message_is_approved(self):
+        response = self.client.post(self.url, {'message': "Refunded? No, refunds are fine"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['moderation_status'], APPROVED)
+        self.assertEqual(self.client.get(self.url).data['count'], 1)
+
+
+class TermMatcherTests(SimpleTestCase):
+    def find(self, terms, text):
+        return sorted(term for term, _ in TermMatcher({t: True for t in terms}).matches(text))
+
+    def test_overlapping_terms(self):
+        self.assertEqual(self.find(['he', 'she', 'hers', 'his'], "she said hers is his, he agreed"),
+                         ['he', 'hers', 'his', 'she'])
+
+    def test_word_boundaries(self):
+        self.assertEqual(self.find(['ass'], "class assessment"), [])
+        self.assertEqual(self.find(['ass'], "kick ass!"), ['ass'])
+        self.assertEqual(self.find(['bad word'], "a bad word here"), ['bad word'])
+
+    def test_case_and_unicode_normalization(self):
+        # Fullwidth letters and ligatures fold to their ASCII forms
+        self.assertEqual(self.find(['spam'], "ＳＰＡＭ"), ['spam'])
+        self.assertEqual(self.find(['fine'], "ﬁne"), ['fine'])
+        self.assertEqual(self.find(['STRASSE'], "straße"), ['strasse'])
+
+    def test_many_terms(self):
+        terms = [f'term{i}' for i in range(5000)]
+        matcher = TermMatcher({t: i for i, t in enumerate(terms)})
+        self.assertEqual(len(matcher), 5000)
+        self.assertEqual(list(matcher.matches("nothing term4321 here")), [('term4321', 4321)])
+
+    def test_empty_matcher(self):
+        self.assertEqual(list(TermMatcher({}).matches("anything")), [])
+
+
+class ModerationFilterTests(SimpleTestCase):
+    def write(self, path, terms):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(terms))
+
+    def test_block_beats_flag(self):
+        moderation = ModerationFilter.from_terms(blocked=['scam'], flagged=['refund'])
+        self.assertEqual(moderation.classify("refund scam"), BLOCKED)
+        self.assertEqual(moderation.classify("refund please"), FLAGGED)
+        self.assertEqual(moderation.classify("great app"), APPROVED)
+
+    def test_hot_reload(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            blocklist = os.path.join(tmp, 'blocked.txt')
+            self.write(blocklist, ['# comment', 'scam'])
+            moderation = ModerationFilter(blocklist=blocklist, reload_interval=0)
+            self.assertEqual(moderation.classify("a scam"), BLOCKED)
+            self.assertEqual(moderation.classify("a fraud"), APPROVED)
+
+            self.write(blocklist, ['fraud'])
+            os.utime(blocklist, ns=(1, 1))
+            self.assertEqual(moderation.classify("a scam"), APPROVED)
+            self.assertEqual(moderation.classify("a fraud"), BLOCKED)
+
+    def test_unreadable_files_keep_previous_terms(self):
+        # Nothing loaded yet: nothing to block, but the failure is logged
+        moderation = ModerationFilter(blocklist='/nonexistent/blocked.txt', reload_interval=0)
+        with self.assertLogs('Feedback.moderation', 'WARNING'):
+            self.assertEqual(moderation.classify("anything"), APPROVED)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            blocklist = os.path.join(tmp, 'blocked.txt')
+            self.write(blocklist, ['scam'])
+            moderation = ModerationFilter(blocklist=blocklist, reload_interval=0)
+            self.assertEqual(moderation.classify("a scam"), BLOCKED)
+
+            # A half-finished deploy, then a read error: the old terms stay
+            os.remove(blocklist)
+            with self.assertLogs('Feedback.moderation', 'WARNING'):
+                self.assertEqual(moderation.classify("a scam"), BLOCKED)
+            os.mkdir(blocklist)
+            with self.assertLogs('Feedback.moderation', 'WARNING'):
+                self.assertEqual(moderation.classify("a scam"), BLOCKED)
+
+            # Retried on the next check until the file reads again
+            os.rmdir(blocklist)
+            self.write(blocklist, ['fraud'])
+            self.assertEqual(moderation.classify("a scam"), APPROVED)
+            self.assertEqual(moderation.classify("a fraud"), BLOCKED)
+
+    def test_no_configured_files_approve_everything(self):
+        moderation = ModerationFilter(reload_interval=0)
+        with self.assertNoLogs('Feedback.moderation'):
+            self.assertEqual(moderation.classify("anything"), APPROVED)
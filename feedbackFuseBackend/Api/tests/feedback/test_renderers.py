@@ -0,0 +1,89 @@
+import json
+from datetime import datetime
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.urls import reverse
+from django.utils.timezone import make_aware
+from Feedback.models import FeedbackMessage
+from Feedback.renderers import packb, unpackb, epoch_millis
+
+
+def iso_to_millis(value):
+    return epoch_millis(datetime.fromisoformat(value.replace('Z', '+00:00')))
+
+
+class FeedbackRendererTests(APITestCase):
+    def setUp(self):
+        self.url = reverse('feedback-list')
+        # created_at is auto_now_add, so pin timestamps with update()
+        older = FeedbackMessage.objects.create(message="Could use better mobile responsiveness")
+        newer = FeedbackMessage.objects.create(message="Great app! 👍 " + "x" * 200)
+        FeedbackMessage.objects.filter(id=older.id).update(created_at=make_aware(datetime(2025, 6, 1, 9, 15, 0, 123456)))
+        FeedbackMessage.objects.filter(id=newer.id).update(created_at=make_aware(datetime(2025, 6, 1, 10, 30, 0)))
+
+    def get_json(self, **params):
+        response = self.client.get(self.url, params, HTTP_ACCEPT='application/json')
+        return json.loads(response.content)
+
+    def test_json_is_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+    def test_msgpack_round_trip(self):
+        expected = self.get_json()
+        for result in expected['results']:
+            result['created_at'] = iso_to_millis(result['created_at'])
+
+        response = self.client.get(self.url, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(unpackb(response.content), expected)
+        self.assertLess(len(response.content), len(json.dumps(expected)))
+
+    def test_msgpack_timestamps_are_epoch_millis(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='application/msgpack')
+        oldest = unpackb(response.content)['results'][-1]
+        self.assertEqual(oldest['created_at'], 1748769300123)
+
+    def test_msgpack_with_projection(self):
+        response = self.client.get(self.url, {'fields': 'id,created_at'}, HTTP_ACCEPT='application/msgpack')
+        results = unpackb(response.content)['results']
+        self.assertEqual(set(results[0]), {'id', 'created_at'})
+        self.assertIsInstance(results[0]['created_at'], int)
+
+    def test_ndjson_round_trip(self):
+        expected = self.get_json()
+
+        response = self.client.get(self.url, HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        self.assertEqual(response['X-Total-Count'], '2')
+
+        lines = response.content.decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line) for line in lines], expected['results'])
+
+    def test_ndjson_empty_list(self):
+        FeedbackMessage.objects.all().delete()
+        response = self.client.get(self.url, HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Total-Count'], '0')
+
+    def test_format_query_parameter(self):
+        response = self.client.get(self.url, {'format': 'msgpack'})
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+
+    def test_post_msgpack_response(self):
+        response = self.client.post(self.url, {'message': 'Hi'}, format='json', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        body = unpackb(response.content)
+        self.assertEqual(body['message'], 'Hi')
+        self.assertEqual(body['created_at'], epoch_millis(FeedbackMessage.objects.get(id=body['id']).created_at))
+
+    def test_packb_round_trips_scalars(self):
+        values = [
+            None, True, False, 0, 127, 128, 255, 65536, 2 ** 40, -1, -32, -33, -200, -70000, -2 ** 40,
+            1.5, '', 'é' * 40, 'y' * 300, 'z' * 70000, list(range(20)), {str(i): i for i in range(20)},
+        ]
+        for value in values:
+            with self.subTest(value=repr(value)[:30]):
+                self.assertEqual(unpackb(packb(value)), value)
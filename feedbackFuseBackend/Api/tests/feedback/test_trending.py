@@ -0,0 +1,161 @@
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from Feedback.models import FeedbackMessage
+from Feedback.views import trending_terms, parse_window
+from Feedback.trending import SpaceSaving, TrendingTerms
+
+
+class FeedbackTrendingTests(APITestCase):
+    def setUp(self):
+        self.url = reverse('feedback-trending')
+        self.list_url = reverse('feedback-list')
+        trending_terms.reset()
+        self.addCleanup(trending_terms.reset)
+
+    def test_posts_feed_trending_without_queries(self):
+        trending_terms.rebuild()
+        for message in ["Login is broken", "Login fails again", "Dark mode please"]:
+            self.client.post(self.list_url, {'message': message}, format='json')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'window': '5m', 'limit': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['window'], 300)
+        self.assertEqual(response.data['results'][0], {'term': 'login', 'count': 2})
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_rebuilds_from_table(self):
+        FeedbackMessage.objects.create(message="Export to CSV")
+        FeedbackMessage.objects.create(message="CSV export is slow")
+        FeedbackMessage.objects.create(message="CSV spam", moderation_status=FeedbackMessage.MODERATION_FLAGGED)
+        trending_terms.rebuild()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['results'][:2], [
+            {'term': 'csv', 'count': 2},
+            {'term': 'export', 'count': 2},
+        ])
+
+        # Rows counted by the rebuild are not counted twice
+        response = self.client.post(self.list_url, {'message': "CSV again"}, format='json')
+        self.assertEqual(self.client.get(self.url).data['results'][0], {'term': 'csv', 'count': 3})
+
+    def test_first_post_does_not_scan_table(self):
+        # Only the INSERT; the sketch is built by the background rebuild instead
+        with self.assertNumQueries(1):
+            self.client.post(self.list_url, {'message': "Login is broken"}, format='json')
+        trending_terms.rebuild()
+        self.assertEqual(self.client.get(self.url).data['results'][0], {'term': 'broken', 'count': 1})
+
+    def test_reads_never_query_the_table(self):
+        FeedbackMessage.objects.create(message="Dark mode please")
+        with self.assertNumQueries(0):
+            # Not built yet: empty rather than a scan on the request thread
+            self.assertEqual(self.client.get(self.url).data['results'], [])
+
+        trending_terms.rebuild()
+        FeedbackMessage.objects.create(message="Dark theme too")
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        # Rows written elsewhere wait for the next rebuild
+        self.assertEqual(response.data['results'][0], {'term': 'dark', 'count': 1})
+
+        trending_terms.rebuild()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).data['results'][0], {'term': 'dark', 'count': 2})
+
+    def test_trending_failure_still_returns_created(self):
+        trending_terms.rebuild()
+        with patch.object(trending_terms, '_add', side_effect=RuntimeError('boom')), \
+                self.assertLogs('Feedback.views', 'ERROR'):
+            response = self.client.post(self.list_url, {'message': "Hello"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(FeedbackMessage.objects.count(), 1)
+
+    def test_invalid_window(self):
+        for window in ['abc', '0', '2d', '1000h']:
+            with self.subTest(window=window):
+                response = self.client.get(self.url, {'window': window})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn('error', response.data)
+
+
+class TrendingSketchTests(SimpleTestCase):
+    def test_parse_window(self):
+        self.assertEqual(parse_window('300'), 300)
+        self.assertEqual(parse_window('90s'), 90)
+        self.assertEqual(parse_window('15m'), 900)
+        self.assertEqual(parse_window('1H'), 3600)
+
+    def test_space_saving_is_bounded_and_keeps_heavy_hitters(self):
+        sketch = SpaceSaving(capacity=10)
+        for i in range(1000):
+            sketch.add('hot')
+            sketch.add(f'cold{i}')
+        self.assertEqual(len(sketch.counts), 10)
+        self.assertGreaterEqual(sketch.counts['hot'], 1000)
+
+    def test_space_saving_counts_sum_to_stream_length(self):
+        sketch = SpaceSaving(capacity=5)
+        stream = [f'term{i % 13}' for i in range(500)] + ['rare']
+        for term in stream:
+            sketch.add(term)
+        self.assertEqual(sum(sketch.counts.values()), len(stream))
+        self.assertEqual(sketch._min_count, min(sketch.counts.values()))
+
+    def test_window_slides(self):
+        trending = TrendingTerms(bucket_seconds=60, buckets=10)
+        now = datetime(2025, 6, 1, 12, 0, 30, tzinfo=timezone.utc)
+        trending.add(1, "old news", now - timedelta(minutes=5))
+        trending.add(2, "fresh news", now)
+
+        self.assertEqual(trending.top(60, now=now), [('fresh', 1), ('news', 1)])
+        self.assertEqual(trending.top(600, now=now), [('news', 2), ('fresh', 1), ('old', 1)])
+        # Ten minutes on, everything has left the window
+        self.assertEqual(trending.top(600, now=now + timedelta(minutes=10)), [])
+
+    def test_memory_is_fixed(self):
+        trending = TrendingTerms(bucket_seconds=60, buckets=5, capacity=20)
+        start = datetime(2025, 6, 1, tzinfo=timezone.utc)
+        for i in range(5000):
+            trending.add(i + 1, f"word{i} word{i % 7} common", start + timedelta(seconds=i))
+        counters = sum(len(sketch.counts) for _, sketch in trending._ring if sketch)
+        self.assertLessEqual(counters, 5 * 20)
+
+    def wait_for(self, trending, expected):
+        deadline = time.monotonic() + 5
+        while trending.top(60)[:1] != expected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(trending.top(60)[:1], expected)
+
+    def test_rebuilds_periodically_in_background(self):
+        now = datetime.now(timezone.utc)
+        rows = [(1, "first post", now)]
+        trending = TrendingTerms(loader=lambda since: list(rows), rebuild_seconds=0.01)
+        self.assertEqual(trending.top(60), [])
+        trending.start()
+        self.addCleanup(trending.stop)
+        self.assertEqual(trending._thread.name, 'feedback-trending')
+        self.wait_for(trending, [('first', 1)])
+        # Written by another worker: picked up by a later rebuild
+        rows.append((2, "second post", now))
+        self.wait_for(trending, [('post', 2)])
+
+    def test_rows_added_during_rebuild_are_kept(self):
+        now = datetime.now(timezone.utc)
+
+        def loader(since):
+            yield (1, "first post", now)
+            # Created and published while the table is being read
+            trending.add(2, "second post", now)
+            trending.add(1, "first post", now)
+
+        trending = TrendingTerms(loader=loader)
+        trending.rebuild()
+        self.assertEqual(trending.top(60), [('post', 2), ('first', 1), ('second', 1)])
@@ -3,4 +3,6 @@ from Feedback import views
 
 urlpatterns = [
     path('feedback/', views.FeedbackListView.as_view(), name='feedback-list'),
+    path('feedback/<int:pk>/similar/', views.FeedbackSimilarView.as_view(), name='feedback-similar'),
+    path('feedback/trending/', views.FeedbackTrendingView.as_view(), name='feedback-trending'),
 ]
\ No newline at end of file
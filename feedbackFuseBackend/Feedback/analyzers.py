@@ -0,0 +1,107 @@
+"""
+Pure-Python message analyzers used by the enrichment pipeline.
+
+An analyzer takes the message text and returns a dict with any of
+'language', 'sentiment', 'keywords' and 'bands'. They run in worker processes,
+so this module must not import Django.
+"""
+import re
+from collections import Counter
+from importlib import import_module
+from .minhash import fingerprint
+
+WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+STOPWORDS = {
+    'en': {'the', 'and', 'is', 'it', 'to', 'of', 'a', 'in', 'that', 'this', 'for', 'you', 'with',
+           'was', 'are', 'but', 'not', 'on', 'be', 'have', 'i', 'my', 'so', 'very', 'would', 'could'},
+    'es': {'el', 'la', 'los', 'las', 'de', 'que', 'y', 'en', 'un', 'una', 'es', 'por', 'con', 'no',
+           'para', 'muy', 'pero', 'lo', 'se', 'mi', 'del'},
+    'fr': {'le', 'la', 'les', 'de', 'des', 'et', 'est', 'un', 'une', 'que', 'en', 'pour', 'pas',
+           'je', 'il', 'très', 'mais', 'avec', 'du', 'ce', 'sur'},
+    'de': {'der', 'die', 'das', 'und', 'ist', 'nicht', 'ein', 'eine', 'ich', 'zu', 'mit', 'sehr',
+           'aber', 'es', 'auf', 'für', 'den', 'dem', 'sie', 'wir'},
+    'pt': {'o', 'os', 'as', 'de', 'que', 'e', 'é', 'um', 'uma', 'para', 'com', 'não', 'muito',
+           'mas', 'do', 'da', 'em', 'eu', 'por'},
+    'it': {'il', 'lo', 'gli', 'le', 'di', 'che', 'e', 'è', 'un', 'una', 'per', 'con', 'non',
+           'molto', 'ma', 'del', 'della', 'io', 'sono'},
+}
+ALL_STOPWORDS = set().union(*STOPWORDS.values())
+
+POSITIVE = {
+    'good', 'great', 'love', 'loved', 'awesome', 'excellent', 'amazing', 'nice', 'helpful', 'like',
+    'fast', 'easy', 'clean', 'simple', 'thanks', 'thank', 'perfect', 'fantastic', 'useful', 'happy',
+    'wonderful', 'best', 'enjoy', 'smooth', 'intuitive',
+}
+NEGATIVE = {
+    'bad', 'terrible', 'hate', 'awful', 'slow', 'broken', 'bug', 'bugs', 'crash', 'crashes', 'poor',
+    'worst', 'annoying', 'confusing', 'ugly', 'hard', 'difficult', 'useless', 'disappointed',
+    'error', 'errors', 'fails', 'failed', 'laggy', 'missing',
+}
+NEGATIONS = {'not', 'no', 'never', "isn't", "don't", "doesn't", "wasn't", "can't"}
+
+
+def tokenize(text):
+    return WORD_RE.findall(text.casefold())
+
+
+def guess_language(message):
+    """Pick the language whose stopwords occur most often; None if no evidence."""
+    words = tokenize(message)
+    scores = {lang: sum(word in stopwords for word in words) for lang, stopwords in STOPWORDS.items()}
+    best = max(scores, key=scores.get)
+    return {'language': best if scores[best] else None}
+
+
+def score_sentiment(message):
+    """Lexicon score in [-1, 1]; a preceding negation flips a word."""
+    score = 0
+    hits = 0
+    previous = None
+    for word in tokenize(message):
+        polarity = (word in POSITIVE) - (word in NEGATIVE)
+        if polarity:
+            if previous in NEGATIONS:
+                polarity = -polarity
+            score += polarity
+            hits += 1
+        previous = word
+    return {'sentiment': round(score / hits, 3) if hits else 0.0}
+
+
+def extract_keywords(message, limit=5):
+    """Most frequent non-stopword terms, first occurrence breaking ties."""
+    words = [word for word in tokenize(message) if len(word) >= 3 and word not in ALL_STOPWORDS]
+    return {'keywords': [word[:32] for word, _ in Counter(words).most_common(limit)]}
+
+
+def minhash_bands(message):
+    """MinHash LSH bucket per band, for the near-duplicate index."""
+    return {'bands': fingerprint(message)}
+
+
+_loaded = {}
+
+
+def load_analyzers(paths):
+    """Resolve dotted paths like 'Feedback.analyzers.guess_language'."""
+    key = tuple(paths)
+    if key not in _loaded:
+        analyzers = []
+        for path in paths:
+            module_path, name = path.rsplit('.', 1)
+            analyzers.append(getattr(import_module(module_path), name))
+        _loaded[key] = analyzers
+    return _loaded[key]
+
+
+def analyze_batch(analyzer_paths, rows):
+    """Run every analyzer over (id, message) rows. Returns [(id, result dict)]."""
+    analyzers = load_analyzers(analyzer_paths)
+    results = []
+    for feedback_id, message in rows:
+        result = {}
+        for analyzer in analyzers:
+            result.update(analyzer(message))
+        results.append((feedback_id, result))
+    return results
@@ -1,6 +1,52 @@
+import os
+import sys
 from django.apps import AppConfig
 
+# manage.py commands that serve requests; every other command (migrate,
+# test, shell, the backfills...) runs without the background threads
+SERVING_COMMANDS = {'runserver'}
+
+
+def serves_requests():
+    """False under manage.py / django-admin unless the command serves requests."""
+    program = os.path.basename(sys.argv[0]) if sys.argv else ''
+    if program not in ('manage.py', 'django-admin', 'django-admin.py'):
+        # A WSGI/ASGI server imported the project
+        return True
+    return len(sys.argv) > 1 and sys.argv[1] in SERVING_COMMANDS
+
 
 class FeedbackConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Feedback'
+
+    def ready(self):
+        # Start background work at startup rather than from the first request
+        from .views import FeedbackListView
+        if serves_requests():
+            FeedbackListView.enrichment.start()
+            # Trending reads only memory; the table is read by this thread
+            FeedbackListView.trending.start()
+
+        if FeedbackListView.hot_tail.enabled:
+            connect_hot_tail_invalidation(self)
+
+
+def invalidate_hot_tail(**kwargs):
+    from .views import FeedbackListView
+    FeedbackListView.hot_tail.invalidate()
+
+
+def connect_hot_tail_invalidation(sender):
+    """
+    Deleted or flushed rows must not linger in the shared hot tail. Only
+    connected while the ring is on: any post_delete receiver stops Django
+    from fast-deleting, so queryset.delete() then loads every row.
+    """
+    from django.db.models.signals import post_delete, post_migrate
+    from .models import FeedbackMessage
+
+    post_delete.connect(invalidate_hot_tail, sender=FeedbackMessage, weak=False,
+                        dispatch_uid='feedback-hot-tail-delete')
+    post_migrate.connect(invalidate_hot_tail, sender=sender, weak=False,
+                         dispatch_uid='feedback-hot-tail-flush')
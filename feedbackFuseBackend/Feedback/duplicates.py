@@ -0,0 +1,144 @@
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from .minhash import THRESHOLD, fingerprint, is_near_duplicate, jaccard, shingles
+from .models import FeedbackMessage, FeedbackFingerprint
+
+# Keep IN (...) lists under SQLite's bound parameter limit
+IN_CHUNK = 500
+# Members of one cluster checked per LSH bucket; bounds work on hot buckets
+MEMBERS_PER_CLUSTER = 3
+
+
+def chunked(items, size=IN_CHUNK):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def similar_messages(feedback, limit=10):
+    """
+    Approved messages whose text is near-identical to feedback, found
+    through shared LSH buckets. Returns [(row dict, similarity)].
+    """
+    bands = list(feedback.fingerprints.order_by('band').values_list('bucket', flat=True))
+    if not bands:
+        bands = fingerprint(feedback.message)
+
+    lookup = reduce(or_, [Q(band=band, bucket=bucket) for band, bucket in enumerate(bands)])
+    candidate_ids = FeedbackFingerprint.objects.filter(lookup).exclude(
+        feedback_id=feedback.id
+    ).values('feedback_id')
+    candidates = FeedbackMessage.objects.filter(
+        id__in=candidate_ids, moderation_status=FeedbackMessage.MODERATION_APPROVED
+    ).values('id', 'message', 'created_at')
+
+    target = shingles(feedback.message)
+    scored = []
+    for row in candidates:
+        similarity = jaccard(target, shingles(row['message']))
+        if similarity >= THRESHOLD:
+            scored.append((row, round(similarity, 3)))
+    scored.sort(key=lambda item: (-item[1], -item[0]['id']))
+    return scored[:limit]
+
+
+def index_fingerprints(fingerprints, assign=True):
+    """
+    Store band rows for {feedback id: [bucket per band]} and, unless
+    assign is False, put each message in the cluster of its closest
+    earlier near-duplicate.
+    """
+    if not fingerprints:
+        return
+    rows = [
+        FeedbackFingerprint(feedback_id=feedback_id, band=band, bucket=bucket)
+        for feedback_id, bands in fingerprints.items()
+        for band, bucket in enumerate(bands)
+    ]
+    with transaction.atomic():
+        for ids in chunked(fingerprints):
+            FeedbackFingerprint.objects.filter(feedback_id__in=ids).delete()
+        FeedbackFingerprint.objects.bulk_create(rows, batch_size=IN_CHUNK)
+        if assign:
+            assign_clusters(fingerprints)
+
+
+def assign_clusters(fingerprints):
+    """
+    Cluster new messages against messages that already have a cluster
+    and against each other, in id order. A message joins the lowest
+    cluster among verified matches, otherwise it starts its own.
+    """
+    new_ids = sorted(fingerprints)
+    # (band, bucket) -> cluster id -> a few member ids to verify against
+    buckets = defaultdict(lambda: defaultdict(list))
+    for keys in chunked({bucket for bands in fingerprints.values() for bucket in bands}):
+        existing = FeedbackFingerprint.objects.filter(
+            bucket__in=keys, feedback__cluster_id__isnull=False
+        ).exclude(feedback_id__in=new_ids).values_list('band', 'bucket', 'feedback_id', 'feedback__cluster_id')
+        for band, bucket, feedback_id, cluster_id in existing:
+            members = buckets[band, bucket][cluster_id]
+            if len(members) < MEMBERS_PER_CLUSTER:
+                members.append(feedback_id)
+
+    known = {
+        feedback_id
+        for clusters in buckets.values()
+        for members in clusters.values()
+        for feedback_id in members
+    }
+    texts = {}
+    for ids in chunked(known | set(new_ids)):
+        for feedback_id, message in FeedbackMessage.objects.filter(id__in=ids).values_list('id', 'message'):
+            texts[feedback_id] = shingles(message)
+
+    assigned = defaultdict(list)
+    for feedback_id in new_ids:
+        if feedback_id not in texts:
+            # Deleted since it was fingerprinted
+            continue
+        keys = list(enumerate(fingerprints[feedback_id]))
+        candidates = defaultdict(set)
+        for key in keys:
+            for cluster_id, members in buckets.get(key, {}).items():
+                candidates[cluster_id].update(members)
+        target = texts[feedback_id]
+        # Lowest cluster wins, so stop at the first verified match. Members
+        # deleted since the fingerprint query have no text and are skipped
+        cluster_id = next((
+            candidate for candidate in sorted(candidates)
+            if any(
+                is_near_duplicate(target, texts[other])
+                for other in candidates[candidate] if other in texts
+            )
+        ), feedback_id)
+        assigned[cluster_id].append(feedback_id)
+        for key in keys:
+            members = buckets[key][cluster_id]
+            if len(members) < MEMBERS_PER_CLUSTER:
+                members.append(feedback_id)
+
+    for cluster_id, ids in assigned.items():
+        for chunk in chunked(ids):
+            FeedbackMessage.objects.filter(id__in=chunk).update(cluster_id=cluster_id)
+
+
+def collapse_clusters(queryset):
+    """
+    Keep only the newest message of each near-duplicate cluster and
+    annotate cluster_size. Messages not yet clustered are kept as is.
+    Both are computed within queryset, so filters like ?tag= pick the
+    newest matching member and count only matching members.
+    """
+    clustered = queryset.order_by().filter(cluster_id__isnull=False)
+    newest = clustered.values('cluster_id').annotate(newest=Max('id')).values('newest')
+    size = clustered.filter(cluster_id=OuterRef('cluster_id')).values('cluster_id').annotate(
+        size=Count('id')
+    ).values('size')
+    return queryset.filter(Q(cluster_id__isnull=True) | Q(id__in=newest)).annotate(
+        cluster_size=Coalesce(Subquery(size), 1)
+    )
@@ -0,0 +1,156 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from .analyzers import analyze_batch
+from .duplicates import index_fingerprints
+from .models import FeedbackMessage, FeedbackTag
+
+logger = logging.getLogger(__name__)
+
+
+def process_pool(workers):
+    """
+    A process pool that spawns rather than forks: by the time it starts,
+    this process has other threads (enrichment, trending, logging) whose
+    locks a forked child would inherit mid-use.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+class EnrichmentPipeline:
+    """
+    Tags feedback off the request path. Ids are queued by create(),
+    collected into batches by a background thread, analyzed in a process
+    pool and written back with bulk updates.
+
+    start() is called from FeedbackConfig.ready() in processes that serve
+    requests (and again in forked children), never from a request thread.
+    The queue is bounded: when it is full ids are dropped with a warning
+    and the rows stay unenriched until `manage.py enrich_feedback` picks
+    them up.
+    """
+
+    def __init__(self, analyzers, workers=2, batch_size=100, batch_wait=0.5, queue_size=10000, enabled=True):
+        self.analyzers = list(analyzers)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.queue_size = queue_size
+        self.enabled = enabled
+        self._queue = queue.Queue(queue_size)
+        self._thread = None
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._fork_hook = False
+
+    def start(self):
+        """Start the batching thread and the process pool in this process."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._executor = process_pool(self.workers)
+            self._thread = threading.Thread(target=self._run, name='feedback-enrichment', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+            if not self._fork_hook:
+                # Threads and pools do not survive fork (e.g. gunicorn --preload)
+                os.register_at_fork(after_in_child=self._restart_after_fork)
+                self._fork_hook = True
+
+    def _restart_after_fork(self):
+        if self._pid is None:
+            return
+        self._queue = queue.Queue(self.queue_size)
+        self._lock = threading.Lock()
+        self._pid = None
+        self.start()
+
+    def enqueue(self, feedback_id):
+        if not self.enabled:
+            return
+        if self._pid != os.getpid():
+            logger.warning('Enrichment pipeline not started; feedback %s left for enrich_feedback', feedback_id)
+            return
+        try:
+            self._queue.put_nowait(feedback_id)
+        except queue.Full:
+            logger.warning('Enrichment queue full; feedback %s left for enrich_feedback', feedback_id)
+
+    def enqueue_on_commit(self, feedback_id):
+        """Queue the id once the row is visible to other connections."""
+        if self.enabled:
+            transaction.on_commit(lambda: self.enqueue(feedback_id))
+
+    def _run(self):
+        while True:
+            ids = self._next_batch()
+            try:
+                self.process_batch(ids, self._executor)
+            except Exception:
+                logger.exception('Error enriching feedback batch of %s', len(ids))
+            finally:
+                close_old_connections()
+
+    def _next_batch(self):
+        ids = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(ids) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                ids.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return ids
+
+    def process_batch(self, ids, executor=None):
+        """Analyze and store the given feedback ids. Returns rows enriched."""
+        rows = list(FeedbackMessage.objects.filter(id__in=ids).values_list('id', 'message'))
+        if not rows:
+            return 0
+        results = self.analyze(rows, executor)
+        self.write(results)
+        return len(results)
+
+    def analyze(self, rows, executor=None):
+        if executor is None or len(rows) < 2:
+            return analyze_batch(self.analyzers, rows)
+        chunks = [rows[i::self.workers] for i in range(self.workers)]
+        chunks = [chunk for chunk in chunks if chunk]
+        parts = executor.map(analyze_batch, repeat(self.analyzers), chunks)
+        return [result for part in parts for result in part]
+
+    def write(self, results):
+        # Rows sharing (language, sentiment) go out as one UPDATE ... WHERE id IN,
+        # which is far cheaper than bulk_update()'s per-row CASE expressions
+        now = timezone.now()
+        groups = defaultdict(list)
+        tags = []
+        fingerprints = {}
+        for feedback_id, result in results:
+            groups[(result.get('language'), result.get('sentiment'))].append(feedback_id)
+            tags.extend(FeedbackTag(feedback_id=feedback_id, name=name) for name in result.get('keywords', ()))
+            if 'bands' in result:
+                fingerprints[feedback_id] = result['bands']
+
+        ids = [feedback_id for feedback_id, _ in results]
+        with transaction.atomic():
+            for (language, sentiment), group_ids in groups.items():
+                FeedbackMessage.objects.filter(id__in=group_ids).update(
+                    language=language, sentiment=sentiment, enriched_at=now
+                )
+            FeedbackTag.objects.filter(feedback_id__in=ids).delete()
+            FeedbackTag.objects.bulk_create(tags, ignore_conflicts=True)
+            index_fingerprints(fingerprints)
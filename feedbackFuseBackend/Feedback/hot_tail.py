@@ -0,0 +1,289 @@
+import hashlib
+import mmap
+import os
+import stat
+import struct
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from django.db import connection
+from .models import FeedbackMessage
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to a per-process lock
+    fcntl = None
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+MAGIC = b'FFHT'
+VERSION = 2
+# magic, version, capacity, record size, seq, head, count, warmed_at, database identity
+HEADER = struct.Struct('<4sIIIqqqdq')
+HEADER_SIZE = 64
+SEQ_OFFSET = 16
+WARMED_AT_OFFSET = SEQ_OFFSET + 24
+# id, created_at (epoch microseconds), message length in bytes
+RECORD = struct.Struct('<qqH')
+# 250 characters of UTF-8 always fit
+RECORD_SIZE = 1024
+READ_RETRIES = 100
+
+# What a damaged, missing or unreadable segment raises; callers fall back to the DB
+READ_ERRORS = (OSError, struct.error, UnicodeDecodeError)
+
+
+def to_micros(value):
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def from_micros(value):
+    return EPOCH + timedelta(microseconds=value)
+
+
+def newest_feedback(limit):
+    """Loader for HotTail: the newest approved rows and the approved count."""
+    queryset = FeedbackMessage.objects.filter(moderation_status=FeedbackMessage.MODERATION_APPROVED)
+    return list(queryset.values('id', 'message', 'created_at')[:limit]), queryset.count()
+
+
+def database_identity():
+    """Signed 64-bit id of the configured database, stamped into the header."""
+    name = f"{connection.vendor}:{connection.settings_dict['NAME']}"
+    digest = hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+class HotTail:
+    """
+    The newest approved messages in a fixed-size ring of packed records
+    inside a memory-mapped file, shared by every worker on the host.
+
+    Writers serialize on an flock and bump a sequence number before and
+    after each change (odd while writing). Readers copy the ring without
+    locking and retry if the sequence number moved, so a reader never
+    blocks and never sees a half-written record.
+
+    The ring is filled from the database on first use, whenever the
+    header names another database, after invalidate() (row deletes and
+    flushes) and every `rewarm_seconds`, to pick up anything else written
+    outside the create path.
+
+    The file must be owned by this user and private to it; `path` should
+    live in a directory only the server can write to. No path disables
+    the ring.
+    """
+
+    def __init__(self, path=None, capacity=128, loader=None, rewarm_seconds=300, enabled=True):
+        self.path = path
+        self.capacity = capacity
+        # Callable(limit) -> (newest rows as dicts, total count)
+        self.loader = loader
+        self.rewarm_seconds = rewarm_seconds
+        self.enabled = enabled and path is not None
+        self._mm = None
+        self._fd = None
+        self._open_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    @property
+    def size(self):
+        return HEADER_SIZE + self.capacity * RECORD_SIZE
+
+    def newest(self, limit):
+        """
+        (rows, count) for the newest `limit` messages, newest first, or
+        None when the ring cannot answer and the caller should use the DB.
+        """
+        if not self.enabled or limit > self.capacity:
+            return None
+        self._ensure_warm()
+        snapshot = self._read()
+        if snapshot is None:
+            # A writer that died mid-write leaves the sequence odd; with the
+            # lock held no write is in progress, so repair it and read again
+            with self._locked():
+                self._repair()
+                snapshot = self._read()
+        head, count, records = snapshot
+        available = min(head, self.capacity)
+        if available < limit and available < count:
+            return None
+
+        rows = []
+        for slot in range(available):
+            offset = slot * RECORD_SIZE
+            feedback_id, created_at, length = RECORD.unpack_from(records, offset)
+            start = offset + RECORD.size
+            rows.append({
+                'id': feedback_id,
+                'created_at': from_micros(created_at),
+                'message': records[start:start + length].decode('utf-8'),
+            })
+        rows.sort(key=lambda row: (row['created_at'], row['id']), reverse=True)
+        return rows[:limit], count
+
+    def append(self, feedback_id, message, created_at):
+        """Add a newly created message, overwriting the oldest slot."""
+        if not self.enabled:
+            return
+        self._ensure_warm()
+        with self._locked():
+            if self._find(feedback_id):
+                # Already loaded by a warm-up that saw the committed row
+                return
+            mm = self._mm
+            head, count = struct.unpack_from('<qq', mm, SEQ_OFFSET + 8)
+            self._begin_write()
+            self._write_record(head % self.capacity, feedback_id, message, created_at)
+            struct.pack_into('<qq', mm, SEQ_OFFSET + 8, head + 1, count + 1)
+            self._end_write()
+
+    def warm(self):
+        """Reload the ring from the database."""
+        self._open()
+        with self._locked():
+            self._warm_locked()
+
+    def invalidate(self):
+        """Make every worker reload the ring from the database on next use."""
+        if not self.enabled:
+            return
+        self._open()
+        with self._locked():
+            self._begin_write()
+            struct.pack_into('<d', self._mm, WARMED_AT_OFFSET, 0.0)
+            self._end_write()
+
+    def close(self):
+        with self._open_lock:
+            if self._mm is not None:
+                self._mm.close()
+                os.close(self._fd)
+                self._mm = self._fd = None
+
+    def _warm_locked(self):
+        rows, count = self.loader(self.capacity) if self.loader else ([], 0)
+        mm = self._mm
+        self._repair()
+        self._begin_write()
+        # Oldest first so head % capacity keeps pointing at the oldest slot
+        for slot, row in enumerate(reversed(rows)):
+            self._write_record(slot, row['id'], row['message'], row['created_at'])
+        struct.pack_into('<qqd', mm, SEQ_OFFSET + 8, len(rows), count, time.time())
+        self._end_write()
+
+    def _ensure_warm(self):
+        self._open()
+        warmed_at = struct.unpack_from('<d', self._mm, WARMED_AT_OFFSET)[0]
+        if time.time() - warmed_at < self.rewarm_seconds:
+            return
+        with self._locked():
+            # Another worker may have warmed it while we waited for the lock
+            warmed_at = struct.unpack_from('<d', self._mm, WARMED_AT_OFFSET)[0]
+            if time.time() - warmed_at >= self.rewarm_seconds:
+                self._warm_locked()
+
+    def _read(self):
+        mm = self._mm
+        start = HEADER_SIZE
+        end = HEADER_SIZE + self.capacity * RECORD_SIZE
+        for _ in range(READ_RETRIES):
+            seq = struct.unpack_from('<q', mm, SEQ_OFFSET)[0]
+            if seq & 1:
+                time.sleep(0)
+                continue
+            head, count = struct.unpack_from('<qq', mm, SEQ_OFFSET + 8)
+            records = mm[start:end]
+            if struct.unpack_from('<q', mm, SEQ_OFFSET)[0] == seq:
+                return head, count, records
+        return None
+
+    def _find(self, feedback_id):
+        head = struct.unpack_from('<q', self._mm, SEQ_OFFSET + 8)[0]
+        for slot in range(min(head, self.capacity)):
+            if struct.unpack_from('<q', self._mm, HEADER_SIZE + slot * RECORD_SIZE)[0] == feedback_id:
+                return True
+        return False
+
+    def _write_record(self, slot, feedback_id, message, created_at):
+        data = message.encode('utf-8')[:RECORD_SIZE - RECORD.size]
+        offset = HEADER_SIZE + slot * RECORD_SIZE
+        RECORD.pack_into(self._mm, offset, feedback_id, to_micros(created_at), len(data))
+        self._mm[offset + RECORD.size:offset + RECORD.size + len(data)] = data
+
+    def _begin_write(self):
+        # Forced odd rather than incremented, so a sequence left odd by a
+        # dead writer cannot invert the parity for good
+        seq = struct.unpack_from('<q', self._mm, SEQ_OFFSET)[0]
+        struct.pack_into('<q', self._mm, SEQ_OFFSET, seq | 1)
+
+    def _end_write(self):
+        seq = struct.unpack_from('<q', self._mm, SEQ_OFFSET)[0]
+        struct.pack_into('<q', self._mm, SEQ_OFFSET, (seq | 1) + 1)
+
+    def _repair(self):
+        """With the lock held, an odd sequence can only be a dead writer's."""
+        seq = struct.unpack_from('<q', self._mm, SEQ_OFFSET)[0]
+        if seq & 1:
+            struct.pack_into('<q', self._mm, SEQ_OFFSET, seq + 1)
+
+    def _open(self):
+        if self._mm is not None:
+            return
+        with self._open_lock:
+            if self._mm is not None:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+            # Never follow a symlink planted at the path
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+            try:
+                check_private(fd, self.path)
+                self._fd = fd
+                with self._locked():
+                    if os.fstat(fd).st_size != self.size:
+                        os.ftruncate(fd, self.size)
+                    mm = mmap.mmap(fd, self.size)
+                    identity = database_identity()
+                    header = HEADER.unpack_from(mm)
+                    expected = (MAGIC, VERSION, self.capacity, RECORD_SIZE)
+                    if header[:4] != expected or header[8] != identity:
+                        # New segment, another layout or another database: start empty and cold
+                        HEADER.pack_into(mm, 0, *expected, 0, 0, 0, 0.0, identity)
+                    self._mm = mm
+                    self._repair()
+            except BaseException:
+                self._fd = None
+                os.close(fd)
+                raise
+
+    def _locked(self):
+        return _FileLock(self._fd, self._write_lock)
+
+
+def check_private(fd, path):
+    """Refuse a segment another user created or could write to."""
+    info = os.fstat(fd)
+    if not stat.S_ISREG(info.st_mode):
+        raise PermissionError(f'{path} is not a regular file')
+    if hasattr(os, 'getuid') and (info.st_uid != os.getuid() or info.st_mode & 0o077):
+        raise PermissionError(f'{path} must be owned by this user and private to it')
+
+
+class _FileLock:
+    """Exclusive across threads (threading.Lock) and processes (flock)."""
+
+    def __init__(self, fd, lock):
+        self.fd = fd
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire()
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc_info):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.lock.release()
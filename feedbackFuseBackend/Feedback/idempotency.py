@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from itertools import islice
+
+
+class IdempotencyEntry:
+    """
+    One Idempotency-Key. The request that claims it does the write and
+    calls finish(); concurrent requests with the same key wait on it.
+    """
+
+    def __init__(self, fingerprint, expires_at):
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+        self.result = None
+        self._done = threading.Event()
+
+    def finish(self, result):
+        self.result = result
+        self._done.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+
+class IdempotencyStore:
+    """
+    Bounded in-process store of Idempotency-Key -> result.
+    Entries expire after `ttl` seconds and the oldest finished entries
+    are evicted once more than `max_entries` keys are held. Entries still
+    in flight are never evicted, so a retry cannot claim a key whose
+    write is underway; when only those are left new claims are refused.
+    """
+
+    def __init__(self, max_entries=10000, ttl=24 * 60 * 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, key, fingerprint):
+        """
+        Returns (entry, owner). owner is True when the caller must perform
+        the request and call entry.finish() (or release() on failure).
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry, False
+            if len(self._entries) >= self.max_entries:
+                self._evict(len(self._entries) - self.max_entries + 1)
+                if len(self._entries) >= self.max_entries:
+                    raise IdempotencyConflict(
+                        'Too many requests with an Idempotency-Key in progress',
+                        HTTPStatus.SERVICE_UNAVAILABLE
+                    )
+            entry = IdempotencyEntry(fingerprint, now + self.ttl)
+            self._entries[key] = entry
+            return entry, True
+
+    def release(self, key, entry):
+        """Forget a claim whose request failed so that a retry can run it."""
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        entry.finish(None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self, count):
+        """Drop up to `count` of the oldest finished entries."""
+        # Stop at `count`: this runs under the lock on every keyed POST once full
+        finished = list(islice((key for key, entry in self._entries.items() if entry.done), count))
+        for key in finished:
+            del self._entries[key]
+
+    def _purge(self, now):
+        # TTL is fixed, so insertion order is also expiry order
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            del self._entries[key]
+
+
+class IdempotencyConflict(Exception):
+    """An Idempotency-Key that cannot be replayed for this request."""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
@@ -0,0 +1,21 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from django.db import connection
+
+
+@contextmanager
+def throwaway_database():
+    """
+    Point the default connection at a fresh, migrated test database for
+    the duration, so benchmarks never read or write real feedback. SQLite
+    gets a file rather than :memory: so forked workers can share it.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'bench.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
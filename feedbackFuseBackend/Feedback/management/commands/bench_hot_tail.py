@@ -0,0 +1,54 @@
+import os
+import tempfile
+import time
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+from Feedback.hot_tail import HotTail, newest_feedback
+from Feedback.models import FeedbackMessage
+from Feedback.views import FeedbackListView
+from ._benchdb import throwaway_database
+
+
+class Command(BaseCommand):
+    help = 'Compare first-page list latency from the database and from the hot-tail ring'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, nargs='+', default=[10, 50, 100])
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--rows', type=int, default=50_000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            self.seed(options['rows'], options['batch_size'])
+            self.run(options)
+
+    def seed(self, rows, batch_size):
+        for i in range(0, rows, batch_size):
+            FeedbackMessage.objects.bulk_create(
+                FeedbackMessage(message=f"Benchmark feedback message number {n}")
+                for n in range(i, min(i + batch_size, rows))
+            )
+        self.stdout.write(f"Seeded {rows} approved messages")
+
+    def run(self, options):
+        factory = APIRequestFactory()
+        view = FeedbackListView.as_view()
+        with tempfile.TemporaryDirectory() as directory:
+            hot_tail = HotTail(path=os.path.join(directory, 'hot-tail'), loader=newest_feedback)
+            FeedbackListView.hot_tail, previous = hot_tail, FeedbackListView.hot_tail
+            try:
+                self.stdout.write(f"{'limit':>6} {'source':>8} {'us/request':>11}")
+                for limit in options['limit']:
+                    for source, enabled in [('database', False), ('ring', True)]:
+                        hot_tail.enabled = enabled
+                        request = factory.get('/api/feedback/', {'limit': limit})
+                        view(request).render()
+                        start = time.perf_counter()
+                        for _ in range(options['requests']):
+                            view(factory.get('/api/feedback/', {'limit': limit})).render()
+                        elapsed = (time.perf_counter() - start) / options['requests']
+                        self.stdout.write(f"{limit:>6} {source:>8} {elapsed * 1e6:>11.0f}")
+            finally:
+                FeedbackListView.hot_tail = previous
+                hot_tail.close()
@@ -0,0 +1,191 @@
+import logging
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from Feedback.hot_tail import HotTail, newest_feedback
+from Feedback.models import FeedbackMessage
+from Feedback.request_logging import JSONFormatter, QueueLoggingHandler, RequestIdFilter, SamplingFilter
+from Feedback.views import FeedbackListView
+from ._benchdb import throwaway_database
+
+MODES = ['off', 'sync', 'queue', 'queue+sampled']
+
+
+class SlowFileHandler(logging.FileHandler):
+    """A log sink that takes `delay` seconds per write, like a busy disk or pipe."""
+
+    def __init__(self, filename, delay):
+        super().__init__(filename, encoding='utf-8')
+        self.delay = delay
+        self.setFormatter(JSONFormatter())
+
+    def emit(self, record):
+        if self.delay:
+            time.sleep(self.delay)
+        super().emit(record)
+
+
+class Command(BaseCommand):
+    help = 'Measure the latency request logging adds to feedback POST and GET under concurrent load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='forked processes, like WSGI workers')
+        parser.add_argument('--requests', type=int, default=100, help='per worker, method and round')
+        parser.add_argument('--rounds', type=int, default=3, help='modes are interleaved round by round')
+        parser.add_argument('--sink-delay-ms', type=float, nargs='+', default=[0, 1])
+        parser.add_argument('--resamples', type=int, default=1000, help='bootstrap resamples for the +p50 interval')
+
+    def handle(self, *args, **options):
+        logger = logging.getLogger('Feedback')
+        saved = logger.handlers, logger.disabled
+        view = FeedbackListView
+        saved_hot_tail, enrichment = view.hot_tail, view.enrichment.enabled
+        # Everything runs against a throwaway database; keep benchmark rows out
+        # of enrichment and out of the shared ring (GETs use a private ring)
+        view.enrichment.enabled = False
+
+        self.stdout.write(f"{os.cpu_count()} CPUs, {options['workers']} workers")
+        self.stdout.write(
+            f"{'sink ms':>7} {'mode':>14} {'method':>6} {'p50 us':>8} {'p99 us':>8} "
+            f"{'+p50 us':>8} {'95% CI':>15} {'log us':>7} {'lines':>6}"
+        )
+        try:
+            with throwaway_database(), tempfile.TemporaryDirectory() as directory, \
+                    override_settings(ALLOWED_HOSTS=['*']):
+                FeedbackMessage.objects.bulk_create(
+                    FeedbackMessage(message=f"Seed message {i}") for i in range(200)
+                )
+                view.hot_tail = HotTail(path=os.path.join(directory, 'hot-tail'), loader=newest_feedback)
+                for delay_ms in options['sink_delay_ms']:
+                    for method in ['GET', 'POST']:
+                        self.compare(logger, directory, delay_ms, method, options)
+                view.hot_tail.close()
+        finally:
+            logger.handlers, logger.disabled = saved
+            view.hot_tail, view.enrichment.enabled = saved_hot_tail, enrichment
+
+    def compare(self, logger, directory, delay_ms, method, options):
+        latencies = {mode: [] for mode in MODES}
+        log_time = dict.fromkeys(MODES, 0.0)
+        lines = dict.fromkeys(MODES, 0)
+        for _ in range(options['rounds']):
+            for mode in MODES:
+                path = os.path.join(directory, f'{mode}.jsonl')
+                handler = self.build_handler(mode, path, delay_ms / 1000)
+                logger.handlers = [handler] if handler else []
+                logger.disabled = handler is None
+                timings, spent = run_load(method, options['workers'], options['requests'])
+                latencies[mode] += timings
+                log_time[mode] += spent
+                if handler:
+                    handler.close()
+                    with open(path) as f:
+                        lines[mode] += sum(1 for _ in f)
+                    os.remove(path)
+
+        requests = options['workers'] * options['requests'] * options['rounds']
+        baseline = statistics.median(latencies['off'])
+        for mode in MODES:
+            p50 = statistics.median(latencies[mode])
+            p99 = statistics.quantiles(latencies[mode], n=100)[98]
+            low, high = median_difference_interval(latencies[mode], latencies['off'], options['resamples'])
+            interval = f"[{low * 1e6:+.0f}, {high * 1e6:+.0f}]"
+            self.stdout.write(
+                f"{delay_ms:>7g} {mode:>14} {method:>6} {p50 * 1e6:>8.0f} {p99 * 1e6:>8.0f} "
+                f"{(p50 - baseline) * 1e6:>+8.0f} {interval:>15} "
+                f"{log_time[mode] / requests * 1e6:>7.1f} {lines[mode]:>6}"
+            )
+
+    def build_handler(self, mode, path, delay):
+        if mode == 'off':
+            return None
+        sink = SlowFileHandler(path, delay)
+        handler = sink if mode == 'sync' else QueueLoggingHandler(target=sink)
+        if mode == 'queue+sampled':
+            handler.addFilter(SamplingFilter(rates={'INFO': 0.25}, limits={'INFO': 200}))
+        handler.addFilter(RequestIdFilter())
+        return handler
+
+
+def median_difference_interval(sample, baseline, resamples):
+    """95% bootstrap interval for median(sample) - median(baseline)."""
+    rng = random.Random(0)
+    differences = sorted(
+        statistics.median(rng.choices(sample, k=len(sample)))
+        - statistics.median(rng.choices(baseline, k=len(baseline)))
+        for _ in range(resamples)
+    )
+    return differences[int(resamples * 0.025)], differences[int(resamples * 0.975) - 1]
+
+
+def run_load(method, workers, requests):
+    """Latencies of every request and the total time spent inside log handlers."""
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    processes = [
+        context.Process(target=load_worker, args=(method, n, requests, results))
+        for n in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    latencies, spent = [], 0.0
+    for _ in processes:
+        timings, total = results.get()
+        latencies += timings
+        spent += total
+    for process in processes:
+        process.join()
+    return latencies, spent
+
+
+def load_worker(method, n, requests, results):
+    # Never share the parent's database connection
+    connection.close()
+    handlers = logging.getLogger('Feedback').handlers
+    timed = TimedHandle(handlers[0] if handlers else None)
+    client = Client()
+    timings = []
+    for i in range(requests):
+        start = time.perf_counter()
+        if method == 'GET':
+            client.get('/api/feedback/', {'limit': 20})
+        else:
+            client.post(
+                '/api/feedback/', {'message': f"Benchmark message {os.getpid()}-{n}-{i}"},
+                content_type='application/json'
+            )
+        timings.append(time.perf_counter() - start)
+    if handlers:
+        handlers[0].flush()
+    connection.close()
+    results.put((timings, timed.total))
+
+
+class TimedHandle:
+    """Sum the time request threads spend inside handler.handle()."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.total = 0.0
+        self._lock = threading.Lock()
+        if handler is not None:
+            handle = handler.handle
+
+            def timed(record):
+                start = time.perf_counter()
+                try:
+                    return handle(record)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    with self._lock:
+                        self.total += elapsed
+
+            handler.handle = timed
@@ -0,0 +1,50 @@
+import random
+import re
+import string
+import time
+from django.core.management.base import BaseCommand
+from Feedback.moderation import ModerationFilter, normalize
+
+
+class Command(BaseCommand):
+    help = 'Measure per-message moderation cost as the term list grows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--terms', type=int, nargs='+', default=[100, 1000, 5000, 20000])
+        parser.add_argument('--messages', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        messages = [self.random_text(rng, rng.randint(20, 250)) for _ in range(options['messages'])]
+
+        self.stdout.write(f"{'terms':>7} {'build ms':>9} {'automaton us/msg':>17} {'regex us/msg':>13}")
+        for count in options['terms']:
+            terms = sorted({self.random_word(rng) for _ in range(count)})
+
+            start = time.perf_counter()
+            moderation = ModerationFilter.from_terms(blocked=terms)
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for message in messages:
+                moderation.classify(message)
+            automaton = (time.perf_counter() - start) / len(messages)
+
+            # Naive alternation over the same normalized text
+            pattern = re.compile(r'\b(?:' + '|'.join(map(re.escape, terms)) + r')\b')
+            start = time.perf_counter()
+            for message in messages:
+                pattern.search(normalize(message))
+            regex = (time.perf_counter() - start) / len(messages)
+
+            self.stdout.write(f"{count:>7} {build * 1000:>9.1f} {automaton * 1e6:>17.1f} {regex * 1e6:>13.1f}")
+
+    @staticmethod
+    def random_word(rng):
+        return ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+
+    def random_text(self, rng, length):
+        words = []
+        while sum(len(w) + 1 for w in words) < length:
+            words.append(self.random_word(rng))
+        return ' '.join(words)[:length]
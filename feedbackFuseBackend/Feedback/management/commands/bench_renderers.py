@@ -0,0 +1,58 @@
+import random
+import string
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from Feedback.renderers import MessagePackRenderer, NDJSONRenderer
+
+
+class Command(BaseCommand):
+    help = 'Compare payload size and encode time of the feedback list renderers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        renderers = [
+            ('json', JSONRenderer(), False),
+            ('msgpack', MessagePackRenderer(), True),
+            ('ndjson', NDJSONRenderer(), False),
+        ]
+        self.stdout.write(f"{'rows':>8} {'format':>8} {'bytes':>12} {'ratio':>6} {'encode ms':>10}")
+
+        for rows in options['rows']:
+            native, formatted = self.build_payloads(rows)
+            json_size = None
+            for name, renderer, wants_native in renderers:
+                data = native if wants_native else formatted
+                best = None
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    body = renderer.render(data, renderer.media_type, {})
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                json_size = json_size or len(body)
+                self.stdout.write(
+                    f"{rows:>8} {name:>8} {len(body):>12} {len(body) / json_size:>6.2f} {best * 1000:>10.1f}"
+                )
+
+    def build_payloads(self, rows):
+        """Rows shaped like FeedbackSerializer output, with and without formatted timestamps."""
+        rng = random.Random(rows)
+        now = timezone.now()
+        alphabet = string.ascii_letters + ' ' * 10
+        native = []
+        for i in range(rows):
+            native.append({
+                'id': rows - i,
+                'message': ''.join(rng.choices(alphabet, k=rng.randint(10, 250))),
+                'created_at': now - timedelta(seconds=i * 7, microseconds=rng.randint(0, 999999)),
+            })
+        formatted = [
+            {**row, 'created_at': row['created_at'].isoformat().replace('+00:00', 'Z')}
+            for row in native
+        ]
+        return {'count': rows, 'results': native}, {'count': rows, 'results': formatted}
@@ -0,0 +1,98 @@
+import random
+import statistics
+import string
+import time
+from django.core.management.base import BaseCommand
+from Feedback.duplicates import index_fingerprints, similar_messages
+from Feedback.minhash import THRESHOLD, fingerprint, jaccard, shingles
+from Feedback.models import FeedbackMessage
+from ._benchdb import throwaway_database
+
+COMMON_WORDS = (
+    'app login mobile page slow crash button dark mode search export csv report profile settings '
+    'password email notification load screen menu layout font color upload photo save error sync '
+    'offline update version great love hate please fix add need want would like really very'
+).split()
+
+
+class Command(BaseCommand):
+    help = 'Time similar_messages() on an LSH-indexed table against a brute-force Jaccard scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--queries', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        messages = self.generate(rng, options['rows'])
+        with throwaway_database():
+            self.run(rng, messages, options)
+
+    def run(self, rng, messages, options):
+        start = time.perf_counter()
+        batch_size = options['batch_size']
+        for i in range(0, len(messages), batch_size):
+            rows = FeedbackMessage.objects.bulk_create(
+                [FeedbackMessage(message=message) for message in messages[i:i + batch_size]]
+            )
+            index_fingerprints({row.id: fingerprint(row.message) for row in rows}, assign=False)
+        build = time.perf_counter() - start
+        self.stdout.write(
+            f"Stored and indexed {len(messages)} messages in {build:.1f}s "
+            f"({build / len(messages) * 1e6:.0f}us each)"
+        )
+
+        ids = list(FeedbackMessage.objects.values_list('id', flat=True))
+        queries = FeedbackMessage.objects.in_bulk(rng.sample(ids, options['queries']))
+        lsh_times, brute_times = [], []
+        found = expected = 0
+        for feedback in queries.values():
+            start = time.perf_counter()
+            similar_messages(feedback)
+            lsh_times.append(time.perf_counter() - start)
+            lsh = {row['id'] for row, _ in similar_messages(feedback, limit=None)}
+
+            # What the endpoint would do without the index: read and compare every row
+            start = time.perf_counter()
+            target = shingles(feedback.message)
+            brute = {
+                other for other, message in FeedbackMessage.objects.values_list('id', 'message').iterator()
+                if other != feedback.id and jaccard(target, shingles(message)) >= THRESHOLD
+            }
+            brute_times.append(time.perf_counter() - start)
+
+            found += len(lsh & brute)
+            expected += len(brute)
+
+        recall = found / expected if expected else 1.0
+        self.stdout.write(
+            f"similar_messages(): {statistics.mean(lsh_times) * 1000:8.2f} ms/query mean, "
+            f"{statistics.median(lsh_times) * 1000:.2f} p50, {max(lsh_times) * 1000:.2f} max"
+        )
+        self.stdout.write(f"Brute-force scan:   {statistics.mean(brute_times) * 1000:8.2f} ms/query mean")
+        self.stdout.write(
+            f"Speedup {sum(brute_times) / sum(lsh_times):.0f}x, "
+            f"recall {recall:.3f} ({found}/{expected} near-duplicates)"
+        )
+
+    def generate(self, rng, rows):
+        """
+        Families of reworded complaints: each base sentence gets a few
+        edited copies. Words follow a Zipf-like distribution over a few
+        thousand terms, like real feedback.
+        """
+        vocabulary = COMMON_WORDS + [
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(3000)
+        ]
+        weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+        messages = []
+        while len(messages) < rows:
+            base = rng.choices(vocabulary, weights, k=rng.randint(6, 20))
+            messages.append(' '.join(base))
+            for _ in range(rng.randint(0, 4)):
+                variant = list(base)
+                for _ in range(rng.randint(1, 2)):
+                    variant[rng.randrange(len(variant))] = rng.choices(vocabulary, weights)[0]
+                messages.append(' '.join(variant))
+        return messages[:rows]
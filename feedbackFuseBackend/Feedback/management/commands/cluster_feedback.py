@@ -0,0 +1,82 @@
+import time
+from collections import defaultdict
+from itertools import repeat
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from Feedback.analyzers import analyze_batch
+from Feedback.duplicates import assign_clusters, index_fingerprints
+from Feedback.enrichment import process_pool
+from Feedback.models import FeedbackMessage, FeedbackFingerprint
+
+ANALYZERS = ['Feedback.analyzers.minhash_bands']
+
+
+class Command(BaseCommand):
+    help = 'Fingerprint existing feedback and group near-duplicates into clusters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Recluster every message from scratch')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=2)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        workers = options['workers']
+        start = time.perf_counter()
+
+        if options['reset']:
+            FeedbackMessage.objects.update(cluster_id=None)
+
+        executor = process_pool(workers) if workers > 1 else None
+        try:
+            fingerprinted = self.fingerprint_missing(batch_size, executor, workers)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self.stdout.write(f"Fingerprinted {fingerprinted} rows in {time.perf_counter() - start:.2f}s")
+
+        clustered = self.cluster_unassigned(batch_size)
+        elapsed = time.perf_counter() - start
+        clusters = FeedbackMessage.objects.filter(cluster_id__isnull=False).values('cluster_id').annotate(
+            size=Count('id')
+        ).filter(size__gt=1).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Clustered {clustered} rows in {elapsed:.2f}s ({clustered / elapsed if elapsed else 0:.0f} rows/s), "
+            f"{clusters} clusters with near-duplicates"
+        ))
+
+    def fingerprint_missing(self, batch_size, executor, workers):
+        queryset = FeedbackMessage.objects.filter(fingerprints__isnull=True).order_by('id')
+        done = 0
+        last_id = 0
+        while True:
+            rows = list(queryset.filter(id__gt=last_id).values_list('id', 'message')[:batch_size])
+            if not rows:
+                return done
+            if executor is None:
+                results = analyze_batch(ANALYZERS, rows)
+            else:
+                chunks = [rows[i::workers] for i in range(workers)]
+                parts = executor.map(analyze_batch, repeat(ANALYZERS), [chunk for chunk in chunks if chunk])
+                results = [result for part in parts for result in part]
+            index_fingerprints({feedback_id: result['bands'] for feedback_id, result in results}, assign=False)
+            done += len(rows)
+            last_id = rows[-1][0]
+
+    def cluster_unassigned(self, batch_size):
+        # Oldest first, so each cluster is named after its oldest message
+        queryset = FeedbackMessage.objects.filter(cluster_id__isnull=True).order_by('id')
+        done = 0
+        last_id = 0
+        while True:
+            ids = list(queryset.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return done
+            fingerprints = defaultdict(list)
+            for feedback_id, bucket in FeedbackFingerprint.objects.filter(
+                feedback_id__in=ids
+            ).order_by('feedback_id', 'band').values_list('feedback_id', 'bucket'):
+                fingerprints[feedback_id].append(bucket)
+            assign_clusters(dict(fingerprints))
+            done += len(fingerprints)
+            last_id = ids[-1]
@@ -0,0 +1,45 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from Feedback.enrichment import EnrichmentPipeline, process_pool
+from Feedback.models import FeedbackMessage
+
+
+class Command(BaseCommand):
+    help = 'Backfill language, sentiment and keyword tags for existing feedback'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-enrich rows that already have tags')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=getattr(settings, 'FEEDBACK_ENRICHMENT_WORKERS', 2))
+
+    def handle(self, *args, **options):
+        pipeline = EnrichmentPipeline(
+            analyzers=getattr(settings, 'FEEDBACK_ENRICHMENT_ANALYZERS', []),
+            workers=options['workers'],
+        )
+        queryset = FeedbackMessage.objects.order_by('id')
+        if not options['all']:
+            queryset = queryset.filter(enriched_at__isnull=True)
+
+        total = queryset.count()
+        done = 0
+        last_id = 0
+        start = time.perf_counter()
+        executor = process_pool(options['workers']) if options['workers'] > 1 else None
+        try:
+            while True:
+                ids = list(queryset.filter(id__gt=last_id).values_list('id', flat=True)[:options['batch_size']])
+                if not ids:
+                    break
+                done += pipeline.process_batch(ids, executor)
+                last_id = ids[-1]
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f"{done}/{total} rows, {done / elapsed:.0f} rows/s")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        elapsed = time.perf_counter() - start
+        rate = done / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(f"Enriched {done} rows in {elapsed:.2f}s ({rate:.0f} rows/s)"))
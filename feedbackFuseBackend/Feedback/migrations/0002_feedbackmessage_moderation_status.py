@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Feedback', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedbackmessage',
+            name='moderation_status',
+            field=models.CharField(choices=[('approved', 'Approved'), ('flagged', 'Flagged')], default='approved', max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='feedbackmessage',
+            index=models.Index(fields=['moderation_status', '-created_at'], name='feedback_moderation_idx'),
+        ),
+    ]
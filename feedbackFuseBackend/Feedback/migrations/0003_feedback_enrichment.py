@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Feedback', '0002_feedbackmessage_moderation_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedbackmessage',
+            name='enriched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='feedbackmessage',
+            name='language',
+            field=models.CharField(blank=True, db_index=True, max_length=8, null=True),
+        ),
+        migrations.AddField(
+            model_name='feedbackmessage',
+            name='sentiment',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='FeedbackTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=32)),
+                ('feedback', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tags', to='Feedback.feedbackmessage')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['name', 'feedback'], name='feedback_tag_name_idx')],
+                'constraints': [models.UniqueConstraint(fields=('feedback', 'name'), name='unique_feedback_tag')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Feedback', '0003_feedback_enrichment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedbackmessage',
+            name='cluster_id',
+            field=models.BigIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='FeedbackFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('feedback', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprints', to='Feedback.feedbackmessage')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket', 'band'], name='feedback_fingerprint_idx')],
+            },
+        ),
+    ]
@@ -3,11 +3,59 @@ from django.db import models
 # Create your models here.
 
 class FeedbackMessage(models.Model):
+    MODERATION_APPROVED = 'approved'
+    MODERATION_FLAGGED = 'flagged'
+    MODERATION_CHOICES = [
+        (MODERATION_APPROVED, 'Approved'),
+        (MODERATION_FLAGGED, 'Flagged'),  # Held back from the wall for review
+    ]
+
     message = models.CharField(max_length=250)
     created_at = models.DateTimeField(auto_now_add=True)
+    moderation_status = models.CharField(
+        max_length=16, choices=MODERATION_CHOICES, default=MODERATION_APPROVED
+    )
+    # Filled in off the request path by the enrichment pipeline
+    language = models.CharField(max_length=8, null=True, blank=True, db_index=True)
+    sentiment = models.FloatField(null=True, blank=True)
+    enriched_at = models.DateTimeField(null=True, blank=True)
+    # Id of the oldest message in this message's near-duplicate cluster
+    cluster_id = models.BigIntegerField(null=True, blank=True, db_index=True)
 
     class Meta:
         ordering = ['-created_at']  # Newest first
+        indexes = [
+            # The wall lists approved messages newest first
+            models.Index(fields=['moderation_status', '-created_at'], name='feedback_moderation_idx'),
+        ]
     
     def __str__(self):
-        return f"Feedback {self.id}: {self.message[:50]}..."
\ No newline at end of file
+        return f"Feedback {self.id}: {self.message[:50]}..."
+
+
+class FeedbackTag(models.Model):
+    feedback = models.ForeignKey(FeedbackMessage, related_name='tags', on_delete=models.CASCADE)
+    name = models.CharField(max_length=32)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['feedback', 'name'], name='unique_feedback_tag'),
+        ]
+        indexes = [
+            models.Index(fields=['name', 'feedback'], name='feedback_tag_name_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.feedback_id})"
+
+
+class FeedbackFingerprint(models.Model):
+    """One MinHash LSH band of a message; equal (band, bucket) rows are candidates."""
+    feedback = models.ForeignKey(FeedbackMessage, related_name='fingerprints', on_delete=models.CASCADE)
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['bucket', 'band'], name='feedback_fingerprint_idx'),
+        ]
@@ -0,0 +1,177 @@
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import deque
+
+APPROVED = 'approved'
+FLAGGED = 'flagged'
+BLOCKED = 'blocked'
+
+# Higher wins when a message matches terms from several lists
+SEVERITY = {APPROVED: 0, FLAGGED: 1, BLOCKED: 2}
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text):
+    """Fold case and Unicode compatibility forms so lookalikes match."""
+    return unicodedata.normalize('NFKC', text).casefold()
+
+
+class TermMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of terms.
+    Scanning is linear in the text length regardless of how many terms
+    are loaded. Terms only match on word boundaries.
+    """
+
+    def __init__(self, terms):
+        """terms: mapping of term -> value reported when it matches."""
+        self._goto = [{}]
+        self._fail = [0]
+        # Per state: tuple of (term length, value) ending here
+        self._out = [()]
+        self.term_count = 0
+
+        for term, value in terms.items():
+            term = normalize(term.strip())
+            if not term:
+                continue
+            state = 0
+            for ch in term:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][ch] = next_state
+                state = next_state
+            if not self._out[state]:
+                self.term_count += 1
+            self._out[state] = ((len(term), value),)
+
+        self._build_fail_links()
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                self._fail[next_state] = fail
+                # Inherit matches that end at the fallback state
+                self._out[next_state] = self._out[next_state] + self._out[fail]
+
+    def __len__(self):
+        return self.term_count
+
+    def matches(self, text):
+        """Yield (term, value) for each term occurring in text as a whole word."""
+        text = normalize(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        last = len(text) - 1
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            if i < last and text[i + 1].isalnum():
+                continue
+            for length, value in out[state]:
+                start = i - length + 1
+                if start == 0 or not text[start - 1].isalnum():
+                    yield text[start:i + 1], value
+
+
+class ModerationFilter:
+    """
+    Classifies messages as approved, flagged or blocked from term list
+    files (one term per line, '#' comments). The files are re-read when
+    they change on disk, checked at most every `reload_interval` seconds.
+    A list that cannot be read keeps the terms loaded last, and is tried
+    again on the next check.
+    """
+
+    def __init__(self, blocklist=None, flaglist=None, reload_interval=1.0):
+        self.paths = {BLOCKED: blocklist, FLAGGED: flaglist}
+        self.reload_interval = reload_interval
+        self._mtimes = None
+        self._checked_at = float('-inf')
+        self._lock = threading.Lock()
+        self.matcher = TermMatcher({})
+
+    @classmethod
+    def from_terms(cls, blocked=(), flagged=()):
+        """Build a filter from in-memory term lists instead of files."""
+        moderation = cls()
+        moderation.matcher = cls.build_matcher(blocked, flagged)
+        return moderation
+
+    @staticmethod
+    def build_matcher(blocked=(), flagged=()):
+        terms = {term: FLAGGED for term in flagged}
+        terms.update({term: BLOCKED for term in blocked})
+        return TermMatcher(terms)
+
+    def classify(self, message):
+        self.maybe_reload()
+        result = APPROVED
+        for _, status in self.matcher.matches(message):
+            if SEVERITY[status] > SEVERITY[result]:
+                result = status
+                if result == BLOCKED:
+                    break
+        return result
+
+    def maybe_reload(self):
+        if not any(self.paths.values()):
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+            mtimes = {status: self._mtime(path) for status, path in self.paths.items()}
+            if mtimes != self._mtimes and self.reload():
+                self._mtimes = mtimes
+
+    def reload(self):
+        """
+        Rebuild the automaton from the term list files and swap it in.
+        False, with the previous automaton kept, if a file cannot be read.
+        """
+        try:
+            lists = {status: self._read_terms(path) for status, path in self.paths.items()}
+        except (OSError, UnicodeDecodeError):
+            logger.warning('Error reading moderation term lists; keeping the previous terms', exc_info=True)
+            return False
+        self.matcher = self.build_matcher(lists[BLOCKED], lists[FLAGGED])
+        return True
+
+    @staticmethod
+    def _mtime(path):
+        if not path:
+            return None
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read_terms(path):
+        if not path:
+            return []
+        with open(path, encoding='utf-8') as f:
+            lines = [line.strip() for line in f]
+        return [line for line in lines if line and not line.startswith('#')]
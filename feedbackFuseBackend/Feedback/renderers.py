@@ -0,0 +1,226 @@
+import struct
+from datetime import datetime, timezone
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def epoch_millis(value):
+    """Milliseconds since the Unix epoch for an aware datetime."""
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000 + delta.microseconds // 1000
+
+
+def packb(obj):
+    """
+    Encode obj as MessagePack. Datetimes are written as epoch-millisecond
+    integers. Only the types the feedback API produces are supported.
+    """
+    buf = bytearray()
+    _pack(obj, buf)
+    return bytes(buf)
+
+
+def _pack(obj, buf):
+    if obj is None:
+        buf.append(0xc0)
+    elif obj is True:
+        buf.append(0xc3)
+    elif obj is False:
+        buf.append(0xc2)
+    elif isinstance(obj, int):
+        _pack_int(obj, buf)
+    elif isinstance(obj, str):
+        data = obj.encode('utf-8')
+        n = len(data)
+        if n < 32:
+            buf.append(0xa0 | n)
+        elif n < 0x100:
+            buf += struct.pack('>BB', 0xd9, n)
+        elif n < 0x10000:
+            buf += struct.pack('>BH', 0xda, n)
+        else:
+            buf += struct.pack('>BI', 0xdb, n)
+        buf += data
+    elif isinstance(obj, dict):
+        n = len(obj)
+        if n < 16:
+            buf.append(0x80 | n)
+        elif n < 0x10000:
+            buf += struct.pack('>BH', 0xde, n)
+        else:
+            buf += struct.pack('>BI', 0xdf, n)
+        for key, value in obj.items():
+            _pack(key, buf)
+            _pack(value, buf)
+    elif isinstance(obj, (list, tuple)):
+        n = len(obj)
+        if n < 16:
+            buf.append(0x90 | n)
+        elif n < 0x10000:
+            buf += struct.pack('>BH', 0xdc, n)
+        else:
+            buf += struct.pack('>BI', 0xdd, n)
+        for item in obj:
+            _pack(item, buf)
+    elif isinstance(obj, datetime):
+        _pack_int(epoch_millis(obj), buf)
+    elif isinstance(obj, float):
+        buf += struct.pack('>Bd', 0xcb, obj)
+    elif isinstance(obj, bytes):
+        n = len(obj)
+        if n < 0x100:
+            buf += struct.pack('>BB', 0xc4, n)
+        elif n < 0x10000:
+            buf += struct.pack('>BH', 0xc5, n)
+        else:
+            buf += struct.pack('>BI', 0xc6, n)
+        buf += obj
+    else:
+        # Lazy strings, decimals, etc.
+        _pack(str(obj), buf)
+
+
+def _pack_int(n, buf):
+    if 0 <= n < 0x80:
+        buf.append(n)
+    elif -32 <= n < 0:
+        buf.append(n & 0xff)
+    elif n >= 0:
+        if n < 0x100:
+            buf += struct.pack('>BB', 0xcc, n)
+        elif n < 0x10000:
+            buf += struct.pack('>BH', 0xcd, n)
+        elif n < 0x100000000:
+            buf += struct.pack('>BI', 0xce, n)
+        else:
+            buf += struct.pack('>BQ', 0xcf, n)
+    else:
+        if n >= -0x80:
+            buf += struct.pack('>Bb', 0xd0, n)
+        elif n >= -0x8000:
+            buf += struct.pack('>Bh', 0xd1, n)
+        elif n >= -0x80000000:
+            buf += struct.pack('>Bi', 0xd2, n)
+        else:
+            buf += struct.pack('>Bq', 0xd3, n)
+
+
+def unpackb(data):
+    """Decode a MessagePack document produced by packb."""
+    obj, offset = _unpack(memoryview(data), 0)
+    if offset != len(data):
+        raise ValueError('Extra data after MessagePack document')
+    return obj
+
+
+_FIXED = {
+    0xcc: '>B', 0xcd: '>H', 0xce: '>I', 0xcf: '>Q',
+    0xd0: '>b', 0xd1: '>h', 0xd2: '>i', 0xd3: '>q',
+    0xca: '>f', 0xcb: '>d',
+}
+
+
+def _unpack(data, offset):
+    code = data[offset]
+    offset += 1
+    if code < 0x80:
+        return code, offset
+    if code >= 0xe0:
+        return code - 0x100, offset
+    if 0xa0 <= code <= 0xbf:
+        return _unpack_str(data, offset, code & 0x1f)
+    if 0x90 <= code <= 0x9f:
+        return _unpack_array(data, offset, code & 0x0f)
+    if 0x80 <= code <= 0x8f:
+        return _unpack_map(data, offset, code & 0x0f)
+    if code == 0xc0:
+        return None, offset
+    if code == 0xc2:
+        return False, offset
+    if code == 0xc3:
+        return True, offset
+    if code in _FIXED:
+        fmt = _FIXED[code]
+        return struct.unpack_from(fmt, data, offset)[0], offset + struct.calcsize(fmt)
+    if code in (0xd9, 0xda, 0xdb, 0xc4, 0xc5, 0xc6, 0xdc, 0xdd, 0xde, 0xdf):
+        fmt = {0xd9: '>B', 0xda: '>H', 0xdb: '>I', 0xc4: '>B', 0xc5: '>H', 0xc6: '>I',
+               0xdc: '>H', 0xdd: '>I', 0xde: '>H', 0xdf: '>I'}[code]
+        n = struct.unpack_from(fmt, data, offset)[0]
+        offset += struct.calcsize(fmt)
+        if code in (0xd9, 0xda, 0xdb):
+            return _unpack_str(data, offset, n)
+        if code in (0xc4, 0xc5, 0xc6):
+            return bytes(data[offset:offset + n]), offset + n
+        if code in (0xdc, 0xdd):
+            return _unpack_array(data, offset, n)
+        return _unpack_map(data, offset, n)
+    raise ValueError(f'Unsupported MessagePack type 0x{code:02x}')
+
+
+def _unpack_str(data, offset, n):
+    return str(data[offset:offset + n], 'utf-8'), offset + n
+
+
+def _unpack_array(data, offset, n):
+    items = []
+    for _ in range(n):
+        item, offset = _unpack(data, offset)
+        items.append(item)
+    return items, offset
+
+
+def _unpack_map(data, offset, n):
+    result = {}
+    for _ in range(n):
+        key, offset = _unpack(data, offset)
+        result[key], offset = _unpack(data, offset)
+    return result, offset
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Compact binary encoding of the feedback API.
+    Timestamps are epoch milliseconds instead of ISO 8601 strings.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    # Ask the view for datetime objects rather than formatted strings
+    native_datetimes = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return packb(data)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline delimited JSON: one list result per line, so consumers can
+    stream-parse a page without loading the whole document. The total
+    count is sent in the X-Total-Count header.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+        if isinstance(data, dict) and 'results' in data:
+            response = (renderer_context or {}).get('response')
+            if response is not None and 'count' in data:
+                response['X-Total-Count'] = str(data['count'])
+            rows = data['results']
+        else:
+            rows = [data]
+
+        if not rows:
+            return b''
+        return ('\n'.join(map(encoder.encode, rows)) + '\n').encode('utf-8')
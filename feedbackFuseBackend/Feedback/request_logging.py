@@ -0,0 +1,223 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+
+# Set by RequestLogMiddleware for the duration of a request
+request_id = contextvars.ContextVar('request_id', default=None)
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+# Attributes every LogRecord has; anything else came in through extra=
+RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+request_logger = logging.getLogger('Feedback.requests')
+
+
+def level_number(level):
+    """20 for 'INFO' or 20."""
+    return level if isinstance(level, int) else logging.getLevelName(level.upper())
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any extra fields."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat().replace('+00:00', 'Z'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the id of the request that produced them."""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of records per level, then cap what is left at a
+    number of records per second per level (token bucket, one second of
+    burst). The next record kept after a drop carries `dropped`, the
+    number of records of its level discarded since the last one.
+
+    Levels missing from `rates` are always kept; levels missing from
+    `limits` are never rate limited.
+    """
+
+    def __init__(self, rates=None, limits=None, clock=time.monotonic):
+        super().__init__()
+        self.rates = {level_number(level): rate for level, rate in (rates or {}).items()}
+        self.limits = {level_number(level): limit for level, limit in (limits or {}).items()}
+        self.clock = clock
+        # level -> [tokens, last refill]
+        self._buckets = {level: [float(limit), clock()] for level, limit in self.limits.items()}
+        self._dropped = dict.fromkeys(set(self.rates) | set(self.limits), 0)
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        level = record.levelno
+        rate = self.rates.get(level, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            return self._drop(level)
+
+        limit = self.limits.get(level)
+        with self._lock:
+            if limit is not None:
+                bucket = self._buckets[level]
+                now = self.clock()
+                bucket[0] = min(limit, bucket[0] + (now - bucket[1]) * limit)
+                bucket[1] = now
+                if bucket[0] < 1:
+                    self._dropped[level] += 1
+                    return False
+                bucket[0] -= 1
+            dropped = self._dropped.get(level)
+            if dropped:
+                record.dropped = dropped
+                self._dropped[level] = 0
+        return True
+
+    def _drop(self, level):
+        with self._lock:
+            self._dropped[level] += 1
+        return False
+
+
+class QueueLoggingHandler(QueueHandler):
+    """
+    Hands records to a background QueueListener thread that writes them
+    as JSON lines to `filename` (or `stream`, stderr by default, or any
+    `target` handler). The calling thread only formats the message and
+    enqueues it; when the queue is full the record is dropped instead of
+    blocking the request.
+
+    A forked child gets a new queue and lock: the parent's queue may hold
+    records the parent still writes, and its mutex may have been held by
+    the parent's listener thread at the moment of the fork.
+    """
+
+    def __init__(self, filename=None, stream=None, max_queue=10000, target=None):
+        super().__init__(queue.Queue(max_queue))
+        self.max_queue = max_queue
+        if target is not None:
+            self.target = target
+        elif filename:
+            os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+            self.target = WatchedFileHandler(filename, encoding='utf-8')
+        else:
+            self.target = logging.StreamHandler(stream or sys.stderr)
+        self.target.setFormatter(JSONFormatter())
+        self.overflowed = 0
+        self.listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def prepare(self, record):
+        # Done here so nothing mutable or frame-holding crosses threads
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = ''.join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        record.stack_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.overflowed += 1
+
+    def _reset_after_fork(self):
+        # Nothing of the parent's queue, lock or listener thread is usable here
+        self.queue = queue.Queue(self.max_queue)
+        self._lock = threading.Lock()
+        self.listener = None
+        self._pid = None
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            # First record, or first in a forked worker: threads do not survive fork
+            self.start()
+        super().emit(record)
+
+    def start(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+                self.listener.start()
+                self._pid = os.getpid()
+
+    def flush(self):
+        """Block until every queued record has been written."""
+        with self._lock:
+            if self.listener is not None and self._pid == os.getpid():
+                self.listener.stop()
+                self._pid = None
+        self.target.flush()
+
+    def close(self):
+        self.flush()
+        self.target.close()
+        super().close()
+
+
+class RequestLogMiddleware:
+    """
+    Give each request an id (X-Request-ID, generated unless the client
+    sent one) and log one line per request with its status and view
+    timing. Log lines written while handling the request carry the same id.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rid = request.headers.get(REQUEST_ID_HEADER, '')[:64] or uuid.uuid4().hex
+        token = request_id.set(rid)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+            duration_ms = (time.perf_counter() - start) * 1000
+            response[REQUEST_ID_HEADER] = rid
+            level = logging.ERROR if response.status_code >= 500 else logging.INFO
+            request_logger.log(
+                level, '%s %s %s', request.method, request.path, response.status_code,
+                extra={
+                    'method': request.method,
+                    'path': request.path,
+                    'status': response.status_code,
+                    'duration_ms': round(duration_ms, 3),
+                },
+            )
+            return response
+        finally:
+            request_id.reset(token)
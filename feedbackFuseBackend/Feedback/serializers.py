@@ -4,4 +4,28 @@ from .models import FeedbackMessage
 class FeedbackSerializer(serializers.ModelSerializer):
     class Meta:
         model = FeedbackMessage
-        fields = ['id', 'message', 'created_at']
\ No newline at end of file
+        fields = ['id', 'message', 'created_at']
+
+    def __init__(self, *args, **kwargs):
+        # Optional sparse fieldset, e.g. fields=['id', 'message']
+        fields = kwargs.pop('fields', None)
+        # Read a truncated message from the `message_preview` annotation
+        preview = kwargs.pop('preview', False)
+        # Leave created_at as a datetime for renderers with their own encoding
+        native_datetimes = kwargs.pop('native_datetimes', False)
+        # Include the cluster_size annotation from collapsed list queries
+        collapse = kwargs.pop('collapse', False)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+        if preview and 'message' in self.fields:
+            self.fields['message'] = serializers.CharField(source='message_preview', read_only=True)
+
+        if native_datetimes and 'created_at' in self.fields:
+            self.fields['created_at'].format = None
+
+        if collapse:
+            self.fields['cluster_size'] = serializers.IntegerField(read_only=True)
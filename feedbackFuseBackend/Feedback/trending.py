@@ -0,0 +1,220 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from django.db import close_old_connections
+from .analyzers import tokenize, ALL_STOPWORDS
+from .models import FeedbackMessage
+
+logger = logging.getLogger(__name__)
+
+
+def terms_of(message):
+    """Distinct terms of a message worth trending on."""
+    return {word for word in tokenize(message) if len(word) >= 3 and word not in ALL_STOPWORDS}
+
+
+def recent_feedback(since):
+    """Loader for TrendingTerms: approved messages created after `since`."""
+    return FeedbackMessage.objects.filter(
+        moderation_status=FeedbackMessage.MODERATION_APPROVED, created_at__gte=since
+    ).values_list('id', 'message', 'created_at').iterator()
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters: at most `capacity` counters. A new term
+    replaces the smallest counter and inherits its count, so estimates
+    never undercount and are exact for terms that were never evicted.
+    Terms are grouped by count so finding the smallest counter is O(1).
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self._by_count = {}
+        self._min_count = 0
+
+    def add(self, term):
+        counts = self.counts
+        count = counts.get(term)
+        if count is None:
+            if len(counts) < self.capacity:
+                count = 0
+                self._min_count = 1
+            else:
+                # Evict any term holding the smallest count and take it over
+                count = self._min_count
+                smallest = self._by_count[count]
+                del counts[smallest.pop()]
+                smallest.add(term)
+        self._move(term, count, count + 1)
+
+    def _move(self, term, old, new):
+        by_count = self._by_count
+        if old:
+            group = by_count[old]
+            group.discard(term)
+            if not group:
+                del by_count[old]
+                if old == self._min_count:
+                    self._min_count = new
+        by_count.setdefault(new, set()).add(term)
+        self.counts[term] = new
+
+
+class TrendingTerms:
+    """
+    Sliding-window top-k over recent messages. Time is split into a ring
+    of `buckets` buckets of `bucket_seconds` each, and every bucket holds
+    its own Space-Saving sketch, so memory is buckets * capacity counters
+    no matter how much feedback arrives.
+
+    Each process holds its own sketch and the create path only feeds the
+    sketch of the worker that served the POST. So with a loader, start()
+    runs a background thread that rebuilds from the table at startup and
+    every `rebuild_seconds`; with N workers, answers can differ by at most
+    that much of the other workers' traffic. A rebuild reads the table
+    into a new ring without holding the lock and swaps it in at the end,
+    so neither top() nor add() ever waits on the database.
+    """
+
+    def __init__(self, bucket_seconds=60, buckets=60, capacity=200, loader=None, rebuild_seconds=60):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.capacity = capacity
+        # Callable(since) -> iterable of (id, message, created_at)
+        self.loader = loader
+        self.rebuild_seconds = rebuild_seconds
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+        self._pid = None
+        self._fork_hook = False
+        self.reset()
+
+    @property
+    def max_window(self):
+        return self.bucket_seconds * self.buckets
+
+    def reset(self):
+        """Drop all counts until the next rebuild."""
+        with self._lock:
+            # Per slot: [bucket index, sketch]
+            self._ring = self._new_ring()
+            self._high_water = None if self.loader is not None else 0
+            # Rows added while a rebuild is reading the table
+            self._pending = None
+
+    def start(self):
+        """Rebuild from the loader now and every `rebuild_seconds`, in the background."""
+        if self.loader is None:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._stopped = threading.Event()
+            self._thread = threading.Thread(target=self._run, name='feedback-trending', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+            if not self._fork_hook:
+                # Threads do not survive fork (e.g. gunicorn --preload)
+                os.register_at_fork(after_in_child=self._restart_after_fork)
+                self._fork_hook = True
+
+    def stop(self):
+        """Stop the background rebuilds after the one in progress."""
+        self._stopped.set()
+        self._pid = None
+
+    def _restart_after_fork(self):
+        if self._pid is None:
+            return
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._pending = None
+        self._pid = None
+        self.start()
+
+    def _run(self):
+        stopped = self._stopped
+        while not stopped.is_set():
+            try:
+                self.rebuild()
+            except Exception:
+                logger.exception('Error rebuilding trending terms')
+            finally:
+                close_old_connections()
+            stopped.wait(self.rebuild_seconds)
+
+    def add(self, feedback_id, message, created_at=None):
+        with self._lock:
+            if self._pending is not None:
+                # The rebuild in progress may have read the table before this row
+                self._pending.append((feedback_id, message, created_at))
+            if self._high_water is None or feedback_id <= self._high_water:
+                # Not built yet, or already counted by the last rebuild
+                return
+            self._add(message, created_at)
+
+    def top(self, window, limit=10, now=None):
+        """[(term, count)] for the `window` seconds before now, highest first."""
+        now_index = self._index(now)
+        span = min(self.buckets, max(1, -(-int(window) // self.bucket_seconds)))
+        totals = {}
+        with self._lock:
+            for index in range(now_index - span + 1, now_index + 1):
+                slot = self._ring[index % self.buckets]
+                if slot[0] == index:
+                    for term, count in slot[1].counts.items():
+                        totals[term] = totals.get(term, 0) + count
+        return sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def rebuild(self):
+        """Recount the window from the loader and swap the result in."""
+        with self._rebuild_lock:
+            with self._lock:
+                self._pending = []
+            try:
+                ring = self._new_ring()
+                high_water = 0
+                if self.loader is not None:
+                    since = datetime.fromtimestamp(time.time() - self.max_window, tz=timezone.utc)
+                    for feedback_id, message, created_at in self.loader(since):
+                        self._add_to(ring, message, created_at)
+                        high_water = max(high_water, feedback_id)
+            except BaseException:
+                with self._lock:
+                    self._pending = None
+                raise
+            with self._lock:
+                pending, self._pending = self._pending, None
+                self._ring, self._high_water = ring, high_water
+                for feedback_id, message, created_at in pending:
+                    if feedback_id > high_water:
+                        self._add(message, created_at)
+
+    def _new_ring(self):
+        return [[None, None] for _ in range(self.buckets)]
+
+    def _index(self, when=None):
+        timestamp = time.time() if when is None else when.timestamp()
+        return int(timestamp // self.bucket_seconds)
+
+    def _add(self, message, created_at):
+        self._add_to(self._ring, message, created_at)
+
+    def _add_to(self, ring, message, created_at):
+        index = self._index(created_at)
+        slot = ring[index % self.buckets]
+        if slot[0] != index:
+            if slot[0] is not None and slot[0] > index:
+                # Older than the window the ring still covers
+                return
+            slot[0] = index
+            slot[1] = SpaceSaving(self.capacity)
+        sketch = slot[1]
+        for term in terms_of(message):
+            sketch.add(term)
@@ -2,26 +2,119 @@ import json
 from django.forms import ValidationError
 from rest_framework import generics, status
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.decorators import api_view
 from django.http import JsonResponse
 from .models import FeedbackMessage
 from .serializers import FeedbackSerializer
+from .renderers import MessagePackRenderer, NDJSONRenderer
+from .idempotency import IdempotencyStore, IdempotencyConflict
+from .moderation import ModerationFilter, BLOCKED
+from .enrichment import EnrichmentPipeline
+from .trending import TrendingTerms, recent_feedback
+from .duplicates import collapse_clusters, similar_messages
+from .hot_tail import HotTail, READ_ERRORS, newest_feedback
 from rest_framework.exceptions import ParseError
+from rest_framework.settings import api_settings
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Left
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Fields a client may request through ?fields=
+LIST_FIELDS = ('id', 'message', 'created_at')
+
+# How long a retry waits for an in-flight request with the same Idempotency-Key
+IDEMPOTENCY_WAIT_SECONDS = 10
+
+# Shared by the create path (writer) and the trending endpoint (reader)
+trending_terms = TrendingTerms(
+    bucket_seconds=getattr(settings, 'FEEDBACK_TRENDING_BUCKET_SECONDS', 60),
+    buckets=getattr(settings, 'FEEDBACK_TRENDING_BUCKETS', 60),
+    capacity=getattr(settings, 'FEEDBACK_TRENDING_CAPACITY', 200),
+    loader=recent_feedback,
+    rebuild_seconds=getattr(settings, 'FEEDBACK_TRENDING_REBUILD_SECONDS', 60),
+)
+
 class FeedbackListView(generics.ListCreateAPIView):
     """
     Get all feedback messages ordered by newest first
     Submit new feedback message
     """
-    queryset = FeedbackMessage.objects.all()
+    queryset = FeedbackMessage.objects.filter(moderation_status=FeedbackMessage.MODERATION_APPROVED)
     serializer_class = FeedbackSerializer
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, MessagePackRenderer, NDJSONRenderer]
+    idempotency_store = IdempotencyStore(
+        max_entries=getattr(settings, 'FEEDBACK_IDEMPOTENCY_MAX_KEYS', 10000),
+        ttl=getattr(settings, 'FEEDBACK_IDEMPOTENCY_TTL', 24 * 60 * 60),
+    )
+    moderation = ModerationFilter(
+        blocklist=getattr(settings, 'FEEDBACK_MODERATION_BLOCKLIST', None),
+        flaglist=getattr(settings, 'FEEDBACK_MODERATION_FLAGLIST', None),
+    )
+    enrichment = EnrichmentPipeline(
+        analyzers=getattr(settings, 'FEEDBACK_ENRICHMENT_ANALYZERS', []),
+        workers=getattr(settings, 'FEEDBACK_ENRICHMENT_WORKERS', 2),
+        batch_size=getattr(settings, 'FEEDBACK_ENRICHMENT_BATCH_SIZE', 100),
+        batch_wait=getattr(settings, 'FEEDBACK_ENRICHMENT_BATCH_WAIT', 0.5),
+        queue_size=getattr(settings, 'FEEDBACK_ENRICHMENT_QUEUE_SIZE', 10000),
+        enabled=getattr(settings, 'FEEDBACK_ENRICHMENT_ENABLED', False),
+    )
+    trending = trending_terms
+    hot_tail = HotTail(
+        path=getattr(settings, 'FEEDBACK_HOT_TAIL_PATH', None),
+        capacity=getattr(settings, 'FEEDBACK_HOT_TAIL_CAPACITY', 128),
+        rewarm_seconds=getattr(settings, 'FEEDBACK_HOT_TAIL_REWARM_SECONDS', 300),
+        enabled=getattr(settings, 'FEEDBACK_HOT_TAIL_ENABLED', False),
+        loader=newest_feedback,
+    )
+
+    def get_serializer(self, *args, **kwargs):
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        if getattr(renderer, 'native_datetimes', False):
+            kwargs.setdefault('native_datetimes', True)
+        return super().get_serializer(*args, **kwargs)
     
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        try:
+            fields, preview_len = self.get_projection(request)
+            limit = self.get_limit(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if limit is not None and not set(request.query_params) & {'tag', 'language', 'collapse'}:
+            # The newest page of the unfiltered wall comes from shared memory
+            try:
+                hit = self.hot_tail.newest(limit)
+            except READ_ERRORS:
+                logger.exception('Error reading the hot tail; listing from the database')
+                hit = None
+            if hit is not None:
+                rows, count = hit
+                return self.list_rows(rows, count, fields, preview_len)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        collapse = request.query_params.get('collapse', '').lower() in ('1', 'true', 'yes')
+        if collapse:
+            queryset = collapse_clusters(queryset)
+
+        if fields is None and preview_len is None:
+            rows = queryset[:limit] if limit is not None else queryset
+            serializer = self.get_serializer(rows, many=True, collapse=collapse)
+        else:
+            # Push the projection into the SELECT so unused columns are never fetched
+            fields = fields or list(LIST_FIELDS)
+            preview = preview_len is not None and 'message' in fields
+            columns = [f for f in fields if not (preview and f == 'message')]
+            if collapse:
+                columns.append('cluster_size')
+            expressions = {'message_preview': Left('message', preview_len)} if preview else {}
+            rows = queryset.values(*columns, **expressions)
+            if limit is not None:
+                rows = rows[:limit]
+            serializer = self.get_serializer(rows, many=True, fields=fields, preview=preview, collapse=collapse)
         
         response_data = {
             'count': queryset.count(),
@@ -29,8 +122,72 @@ class FeedbackListView(generics.ListCreateAPIView):
         }
         
         return Response(response_data, status=status.HTTP_200_OK)
+
+    def list_rows(self, rows, count, fields, preview_len):
+        """Respond with rows already in memory, shaped like list() would."""
+        preview = preview_len is not None and 'message' in (fields or LIST_FIELDS)
+        if preview:
+            rows = [{**row, 'message_preview': row['message'][:preview_len]} for row in rows]
+        serializer = self.get_serializer(rows, many=True, fields=fields, preview=preview)
+        return Response({'count': count, 'results': serializer.data}, status=status.HTTP_200_OK)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # ?tag= and ?language= use the indexes filled in by enrichment
+        tag = self.request.query_params.get('tag')
+        if tag:
+            queryset = queryset.filter(tags__name=tag.strip().casefold())
+        language = self.request.query_params.get('language')
+        if language:
+            queryset = queryset.filter(language=language.strip().lower())
+        return queryset
+
+    def get_projection(self, request):
+        """
+        Parse ?fields=id,message and ?preview_len=N from the query string.
+        Returns (None, None) when neither is supplied.
+        """
+        fields = None
+        raw_fields = request.query_params.get('fields')
+        if raw_fields is not None:
+            fields = [f.strip() for f in raw_fields.split(',') if f.strip()]
+            unknown = [f for f in fields if f not in LIST_FIELDS]
+            if not fields or unknown:
+                raise ValueError(f"fields must be a comma separated subset of: {', '.join(LIST_FIELDS)}")
+
+        preview_len = None
+        raw_preview_len = request.query_params.get('preview_len')
+        if raw_preview_len is not None:
+            try:
+                preview_len = int(raw_preview_len)
+            except ValueError:
+                preview_len = 0
+            if preview_len < 1:
+                raise ValueError('preview_len must be a positive integer')
+
+        return fields, preview_len
+
+    def get_limit(self, request):
+        """Parse ?limit=N, the size of the newest page. None returns every row."""
+        raw_limit = request.query_params.get('limit')
+        if raw_limit is None:
+            return None
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= 100:
+            raise ValueError('limit must be between 1-100')
+        return limit
     
     def create(self, request, *args, **kwargs):
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if idempotency_key is not None and not 1 <= len(idempotency_key) <= 255:
+            return Response(
+                {'error': 'Idempotency-Key must be between 1-255 characters'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         try:
             # Validate message
             message = request.data.get('message', None)
@@ -63,16 +220,40 @@ class FeedbackListView(generics.ListCreateAPIView):
             # Create feedback message
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
-            feedback = serializer.save()
+
+            moderation_status = self.moderation.classify(serializer.validated_data['message'])
+            if moderation_status == BLOCKED:
+                return Response(
+                    {'error': 'Message contains blocked content'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            serializer.validated_data['moderation_status'] = moderation_status
+
+            replayed = False
+            if idempotency_key is None:
+                feedback = serializer.save()
+            else:
+                feedback, replayed = self.save_idempotent(idempotency_key, serializer)
+            if not replayed:
+                self.enrichment.enqueue_on_commit(feedback.id)
+                if feedback.moderation_status == FeedbackMessage.MODERATION_APPROVED:
+                    self.publish(feedback)
             
             # Return response matching spec format
+            created_at = feedback.created_at
+            if not getattr(request.accepted_renderer, 'native_datetimes', False):
+                created_at = created_at.isoformat().replace('+00:00', 'Z')
             response_data = {
                 'id': feedback.id,
                 'message': feedback.message,
-                'created_at': feedback.created_at.isoformat().replace('+00:00', 'Z')
+                'created_at': created_at,
+                'moderation_status': feedback.moderation_status
             }
             
-            return Response(response_data, status=status.HTTP_201_CREATED)
+            headers = {'Idempotent-Replayed': 'true'} if replayed else None
+            return Response(response_data, status=status.HTTP_201_CREATED, headers=headers)
+        except IdempotencyConflict as e:
+            return Response({'error': str(e)}, status=e.status_code)
         except ParseError:
             return Response({'error': 'Invalid JSON'}, status=status.HTTP_400_BAD_REQUEST)
         except json.JSONDecodeError:
@@ -82,9 +263,127 @@ class FeedbackListView(generics.ListCreateAPIView):
                 {'error': 'Message is required and must be between 1-250 characters'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        except Exception as e:
-            logger.error(f"Error creating feedback: {str(e)}")
+        except Exception:
+            logger.exception('Error creating feedback')
             return Response(
                 {'error': 'Internal server error'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+    def publish(self, feedback):
+        """
+        Feed a saved, approved message to the in-memory read paths. The row
+        is already stored, so a failure here is logged and the client still
+        gets its 201; otherwise a retry would create a duplicate.
+        """
+        try:
+            self.trending.add(feedback.id, feedback.message, feedback.created_at)
+        except Exception:
+            logger.exception('Error adding feedback %s to trending terms', feedback.id)
+        # Only committed rows may reach the ring other workers read from
+        transaction.on_commit(lambda: self.append_to_hot_tail(feedback))
+
+    def append_to_hot_tail(self, feedback):
+        try:
+            self.hot_tail.append(feedback.id, feedback.message, feedback.created_at)
+        except Exception:
+            logger.exception('Error adding feedback %s to the hot tail', feedback.id)
+
+    def save_idempotent(self, key, serializer):
+        """
+        Save the feedback at most once per Idempotency-Key.
+        Returns (feedback, replayed). Retries and concurrent duplicates get
+        the original object back without touching the database.
+        """
+        fingerprint = serializer.validated_data['message']
+        while True:
+            entry, owner = self.idempotency_store.claim(key, fingerprint)
+            if owner:
+                break
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyConflict(
+                    'Idempotency-Key was already used with a different message',
+                    status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            if not entry.wait(IDEMPOTENCY_WAIT_SECONDS):
+                raise IdempotencyConflict(
+                    'A request with this Idempotency-Key is still in progress',
+                    status.HTTP_409_CONFLICT
+                )
+            if entry.result is not None:
+                return entry.result, True
+            # The original request failed and released the key; try to claim it again
+
+        try:
+            feedback = serializer.save()
+        except Exception:
+            self.idempotency_store.release(key, entry)
+            raise
+        entry.finish(feedback)
+        return feedback, False
+
+
+class FeedbackSimilarView(APIView):
+    """
+    Approved messages that are near-duplicates of the given message,
+    most similar first
+    """
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, MessagePackRenderer]
+
+    def get(self, request, pk, *args, **kwargs):
+        try:
+            # Messages held back from the wall are not found here either
+            feedback = FeedbackMessage.objects.get(pk=pk, moderation_status=FeedbackMessage.MODERATION_APPROVED)
+        except FeedbackMessage.DoesNotExist:
+            return Response({'error': 'Feedback message not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= 100:
+            return Response({'error': 'limit must be between 1-100'}, status=status.HTTP_400_BAD_REQUEST)
+
+        native_datetimes = getattr(request.accepted_renderer, 'native_datetimes', False)
+        results = []
+        for row, similarity in similar_messages(feedback, limit):
+            serializer = FeedbackSerializer(row, native_datetimes=native_datetimes)
+            results.append({**serializer.data, 'similarity': similarity})
+
+        return Response({'count': len(results), 'results': results}, status=status.HTTP_200_OK)
+
+
+class FeedbackTrendingView(APIView):
+    """
+    Most frequent terms in recent feedback, served from an in-memory
+    sketch without querying the database
+    """
+    trending = trending_terms
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, MessagePackRenderer]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            window = parse_window(request.query_params.get('window', '1h'))
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            return Response(
+                {'error': 'window must look like 300, 90s, 15m or 1h and limit must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 0 < window <= self.trending.max_window or not 1 <= limit <= 100:
+            return Response(
+                {'error': f'window must be between 1s-{self.trending.max_window}s and limit between 1-100'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = [{'term': term, 'count': count} for term, count in self.trending.top(window, limit)]
+        return Response({'window': window, 'results': results}, status=status.HTTP_200_OK)
+
+
+def parse_window(value):
+    """Seconds in a window like '300', '90s', '15m' or '1h'."""
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    value = value.strip().lower()
+    if value[-1:] in units:
+        return int(value[:-1]) * units[value[-1]]
+    return int(value)
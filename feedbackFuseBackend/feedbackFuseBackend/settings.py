@@ -10,11 +10,14 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
@@ -44,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'Feedback.request_logging.RequestLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -128,3 +132,80 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Idempotency-Key replay store for POST /api/feedback/
+FEEDBACK_IDEMPOTENCY_MAX_KEYS = 10000
+FEEDBACK_IDEMPOTENCY_TTL = 24 * 60 * 60  # seconds
+
+# Term lists for the write-path moderation filter, one term per line.
+# Files are reloaded automatically when they change.
+FEEDBACK_MODERATION_BLOCKLIST = BASE_DIR / 'moderation' / 'blocked_terms.txt'
+FEEDBACK_MODERATION_FLAGLIST = BASE_DIR / 'moderation' / 'flagged_terms.txt'
+
+# Background enrichment (language, sentiment, keyword tags) of new feedback
+FEEDBACK_ENRICHMENT_ENABLED = True
+FEEDBACK_ENRICHMENT_ANALYZERS = [
+    'Feedback.analyzers.guess_language',
+    'Feedback.analyzers.score_sentiment',
+    'Feedback.analyzers.extract_keywords',
+    'Feedback.analyzers.minhash_bands',
+]
+FEEDBACK_ENRICHMENT_WORKERS = 2
+FEEDBACK_ENRICHMENT_BATCH_SIZE = 100
+FEEDBACK_ENRICHMENT_BATCH_WAIT = 0.5  # seconds to wait while filling a batch
+FEEDBACK_ENRICHMENT_QUEUE_SIZE = 10000  # ids waiting; beyond this they are dropped
+
+# In-memory trending terms sketch: BUCKETS * BUCKET_SECONDS is the longest window
+FEEDBACK_TRENDING_BUCKET_SECONDS = 60
+FEEDBACK_TRENDING_BUCKETS = 60
+FEEDBACK_TRENDING_CAPACITY = 200  # counters per bucket
+# Each worker keeps its own sketch and only sees its own POSTs between
+# background rebuilds from the table, so workers may disagree by up to this long
+FEEDBACK_TRENDING_REBUILD_SECONDS = 60
+
+# Newest approved messages kept in a memory-mapped ring shared by all
+# workers on the host; GET /api/feedback/?limit=N is served from it.
+# PATH must be in a directory only the server user can write to. The ring
+# is off under `manage.py test`; tests that need one use a temporary path.
+FEEDBACK_HOT_TAIL_ENABLED = not TESTING
+FEEDBACK_HOT_TAIL_PATH = BASE_DIR / 'run' / 'hot-tail.ring'
+FEEDBACK_HOT_TAIL_CAPACITY = 128  # messages; must cover the largest ?limit
+FEEDBACK_HOT_TAIL_REWARM_SECONDS = 300  # reload from the table this often
+
+# Structured request logging. Records from the Feedback loggers are queued
+# and written as JSON lines by a background thread, so the request never
+# waits on log I/O. Per level: the fraction of records kept, then a cap in
+# records per second. Every kept line carries the request_id that is also
+# returned in the X-Request-ID response header. Nothing is written under
+# `manage.py test`; tests that check log lines capture them in memory.
+FEEDBACK_LOG_FILE = BASE_DIR / 'logs' / 'feedback.jsonl'
+FEEDBACK_LOG_SAMPLE_RATES = {'INFO': 0.25}
+FEEDBACK_LOG_RATE_LIMITS = {'INFO': 200, 'WARNING': 50, 'ERROR': 20}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'sampling': {
+            '()': 'Feedback.request_logging.SamplingFilter',
+            'rates': FEEDBACK_LOG_SAMPLE_RATES,
+            'limits': FEEDBACK_LOG_RATE_LIMITS,
+        },
+        'request_id': {'()': 'Feedback.request_logging.RequestIdFilter'},
+    },
+    'handlers': {
+        'json_queue': {'class': 'logging.NullHandler'} if TESTING else {
+            '()': 'Feedback.request_logging.QueueLoggingHandler',
+            'filename': FEEDBACK_LOG_FILE,
+            'max_queue': 10000,
+            'filters': ['sampling', 'request_id'],
+        },
+    },
+    'loggers': {
+        'Feedback': {
+            'handlers': ['json_queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}